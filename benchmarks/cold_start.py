@@ -0,0 +1,77 @@
+# File: benchmarks/cold_start.py
+#
+# Copyright (c) 2019-2025 IntSights Cyber Intelligence Ltd.
+#
+# This unpublished material is proprietary to IntSights.
+# All rights reserved. The methods and
+# techniques described herein are considered trade secrets
+# and/or confidential. Reproduction or distribution, in whole
+# or in part, is forbidden except by express written permission
+# of IntSights.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+"""
+Measure the cold start of the connector: import it and run a single hunt ip in a fresh interpreter.
+
+Started by run_benchmarks.py in a new process for every sample, with the URL of the mock API:
+
+    python benchmarks/cold_start.py http://127.0.0.1:8000
+"""
+
+import time
+
+
+started = time.perf_counter()
+
+import json
+import os
+import sys
+
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.join(BENCHMARKS_DIR, "stubs"), os.path.dirname(BENCHMARKS_DIR)]
+
+from intsights_connector import IntSightsConnector
+
+
+imported = time.perf_counter()
+
+INTSIGHTS_API_URL = "https://api.ti.insight.rapid7.com"
+
+
+def main():
+    url = sys.argv[1]
+    for name in dir(IntSightsConnector):
+        value = getattr(IntSightsConnector, name)
+        if isinstance(value, str) and value.startswith(INTSIGHTS_API_URL):
+            setattr(IntSightsConnector, name, url + value[len(INTSIGHTS_API_URL) :])
+
+    connector = IntSightsConnector()
+    connector.configure({"account_id": "benchmark", "api_key": "benchmark", "ioc_cache_ttl": 0, "ioc_cache_negative_ttl": 0})
+    status = connector.run_action("hunt_ip", {"ip": "10.0.0.1"})
+    finished = time.perf_counter()
+
+    print(
+        json.dumps(
+            {
+                "status": status,
+                "import_ms": round((imported - started) * 1000, 2),
+                "hunt_ip_ms": round((finished - imported) * 1000, 2),
+                "modules": len(sys.modules),
+            }
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
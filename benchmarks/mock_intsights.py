@@ -0,0 +1,195 @@
+# File: benchmarks/mock_intsights.py
+#
+# Copyright (c) 2019-2025 IntSights Cyber Intelligence Ltd.
+#
+# This unpublished material is proprietary to IntSights.
+# All rights reserved. The methods and
+# techniques described herein are considered trade secrets
+# and/or confidential. Reproduction or distribution, in whole
+# or in part, is forbidden except by express written permission
+# of IntSights.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+"""
+Local stand-in for the IntSights API used by the benchmarks.
+
+Serves alerts-list, get-complete-alert, ioc-by-value, iocs/enrich and the alert PATCH endpoints
+with a configurable latency, alert payload size, share of throttled (429) responses and number
+of "InProgress" enrichment rounds. Run it on its own to point a connector at it by hand:
+
+    python benchmarks/mock_intsights.py --alerts 1000 --latency 0.05
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+ALERT_ID_FORMAT = "bench{index:08d}"
+
+
+class MockIntSightsHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, Nagle would delay every response until the client ACKs
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status_code, body=None, headers=None):
+        content = b"" if body is None else json.dumps(body).encode()
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _is_throttled(self):
+        options = self.server.options
+        time.sleep(max(random.gauss(options.latency, options.latency * options.jitter), 0))
+        if options.throttle_rate and random.random() < options.throttle_rate:
+            self._send(429, {"error": "Too many requests"}, {"Retry-After": "0"})
+            return True
+
+        return False
+
+    def do_GET(self):
+        if self._is_throttled():
+            return
+
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        path = url.path
+
+        if path.endswith("/api/version"):
+            return self._send(200, {"version": "benchmark"})
+        if path.endswith("/data/alerts/alerts-list"):
+            return self._send(200, self.server.get_alert_ids(query))
+        if "/data/alerts/get-complete-alert/" in path:
+            alert = self.server.get_alert(path.rsplit("/", 1)[1])
+            return self._send(200, alert) if alert else self._send(404, {"error": "Alert not found"})
+        if path.endswith("/iocs/ioc-by-value"):
+            value = query.get("iocValue", [""])[0]
+            if value.startswith("unknown"):
+                return self._send(204)
+            return self._send(200, {"value": value, "type": "Domains", "severity": "High", "score": 80})
+        if "/iocs/enrich/" in path:
+            return self._send(200, self.server.get_enrichment(path.rsplit("/", 1)[1]))
+
+        self._send(404, {"error": "Not found"})
+
+    def do_PATCH(self):
+        content_length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(content_length)
+        if self._is_throttled():
+            return
+
+        path = urlparse(self.path).path
+        if "/data/alerts/close-alert/" in path or "/data/alerts/takedown-request/" in path:
+            alert_id = path.rsplit("/", 1)[1]
+            return self._send(200) if self.server.get_alert(alert_id) else self._send(400, {"error": "Invalid alert"})
+
+        self._send(404, {"error": "Not found"})
+
+
+class MockIntSightsServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, options):
+        super().__init__((options.host, options.port), MockIntSightsHandler)
+        self.options = options
+        self._found_date = int(time.time() * 1000) - 3600000
+        self._enrichment_rounds = {}
+        self._lock = threading.Lock()
+
+    def get_alert_ids(self, query):
+        found_date_from = int(query.get("foundDateFrom", [0])[0])
+        found_date_to = int(query.get("foundDateTo", [sys.maxsize])[0])
+        if not found_date_from <= self._found_date <= found_date_to:
+            return []
+
+        return [ALERT_ID_FORMAT.format(index=index) for index in range(self.options.alerts)]
+
+    def get_alert(self, alert_id):
+        if not alert_id.startswith("bench"):
+            return None
+
+        index = int(alert_id[len("bench") :])
+        return {
+            "_id": alert_id,
+            "FoundDate": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(self._found_date / 1000)),
+            "UpdateDate": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(self._found_date / 1000)),
+            "IsClosed": False,
+            "Assignees": [],
+            "Assets": [
+                {"Type": "Domains", "Value": f"asset{index}.example.com"},
+                {"Type": "IPs", "Value": f"10.0.{index // 256 % 256}.{index % 256}"},
+            ],
+            "Details": {
+                "Title": f"Benchmark alert {index}",
+                "Description": "x" * self.options.payload_bytes,
+                "Type": "Phishing",
+                "SubType": "SuspiciousDomain",
+                "Severity": ("High", "Medium", "Low")[index % 3],
+                "Source": {"Type": "WHOIS servers", "URL": f"http://asset{index}.example.com", "Date": "2025-01-01T00:00:00.000Z"},
+                "Tags": [{"_id": "tag", "Name": "benchmark"}],
+                "Images": [],
+            },
+        }
+
+    def get_enrichment(self, value):
+        with self._lock:
+            rounds = self._enrichment_rounds.get(value, 0) + 1
+            self._enrichment_rounds[value] = rounds
+
+        if rounds <= self.options.enrichment_rounds:
+            return {"Status": "InProgress", "Data": {}}
+
+        return {"Status": "Done", "OriginalValue": value, "Data": {"Value": value, "Type": "Domains", "Severity": "High"}}
+
+
+def get_argument_parser():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0, help="port to listen on, a free port when 0")
+    parser.add_argument("--alerts", type=int, default=100, help="number of alerts listed by alerts-list")
+    parser.add_argument("--latency", type=float, default=0.0, help="mean latency of every response, in seconds")
+    parser.add_argument("--jitter", type=float, default=0.2, help="standard deviation of the latency, as a share of the latency")
+    parser.add_argument("--payload-bytes", type=int, default=1024, help="size of the description of every alert")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of requests answered with a 429 status")
+    parser.add_argument("--enrichment-rounds", type=int, default=2, help="number of InProgress responses before an enrichment is done")
+    return parser
+
+
+def main():
+    options = get_argument_parser().parse_args()
+    server = MockIntSightsServer(options)
+    # The first line tells the benchmark runner where to send requests
+    print(f"http://{options.host}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
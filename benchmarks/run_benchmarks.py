@@ -0,0 +1,243 @@
+# File: benchmarks/run_benchmarks.py
+#
+# Copyright (c) 2019-2025 IntSights Cyber Intelligence Ltd.
+#
+# This unpublished material is proprietary to IntSights.
+# All rights reserved. The methods and
+# techniques described herein are considered trade secrets
+# and/or confidential. Reproduction or distribution, in whole
+# or in part, is forbidden except by express written permission
+# of IntSights.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+"""
+Offline benchmarks of the IntSights connector.
+
+Every scenario starts the mock IntSights API in its own process and runs the connector actions
+in this process against the phantom.app stub, so no network access nor SOAR instance is needed:
+
+    python benchmarks/run_benchmarks.py --alerts 100,1000,10000 --output results.json
+    python benchmarks/run_benchmarks.py --baseline results.json
+
+Measured: on poll throughput (ingested alerts per second) and peak Python memory for every alert
+count, latency percentiles of hunt ioc, the duration of a bulk hunt and of a multi-IOC enrichment,
+and the cold start of a single hunt ip in a new interpreter (see cold_start.py).
+With --baseline, the run fails when a measurement regressed by more than --tolerance.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.join(BENCHMARKS_DIR, "stubs"), os.path.dirname(BENCHMARKS_DIR)]
+
+from intsights_connector import IntSightsConnector
+
+
+INTSIGHTS_API_URL = "https://api.ti.insight.rapid7.com"
+
+# Direction in which every measurement gets worse, used to compare against a baseline
+HIGHER_IS_WORSE = ("seconds", "_ms", "peak_memory_mb")
+LOWER_IS_WORSE = ("alerts_per_second",)
+
+
+class MockServer:
+    """Run the mock IntSights API in a subprocess for the duration of a with statement."""
+
+    def __init__(self, **options):
+        self._arguments = []
+        for name, value in options.items():
+            self._arguments += [f"--{name.replace('_', '-')}", str(value)]
+        self._process = None
+        self.url = None
+
+    def __enter__(self):
+        self._process = subprocess.Popen(
+            [sys.executable, os.path.join(BENCHMARKS_DIR, "mock_intsights.py"), *self._arguments], stdout=subprocess.PIPE, text=True
+        )
+        self.url = self._process.stdout.readline().strip()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._process.terminate()
+        self._process.wait()
+
+
+class BenchmarkConnector(IntSightsConnector):
+    """Connector sending its requests to the mock API."""
+
+    @classmethod
+    def use_api(cls, url):
+        for name in dir(IntSightsConnector):
+            value = getattr(IntSightsConnector, name)
+            if isinstance(value, str) and value.startswith(INTSIGHTS_API_URL):
+                setattr(cls, name, url + value[len(INTSIGHTS_API_URL) :])
+
+
+def get_percentiles(durations):
+    durations = sorted(duration * 1000 for duration in durations)
+    quantiles = statistics.quantiles(durations, n=100, method="inclusive")
+    return {"p50_ms": round(quantiles[49], 2), "p90_ms": round(quantiles[89], 2), "p99_ms": round(quantiles[98], 2)}
+
+
+def run_action(config, action_id, param, state=None, trace_memory=False):
+    connector = BenchmarkConnector()
+    connector.configure(config, state)
+    if trace_memory:
+        tracemalloc.start()
+
+    started = time.perf_counter()
+    status = connector.run_action(action_id, param)
+    duration = time.perf_counter() - started
+
+    peak_memory = None
+    if trace_memory:
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    if not status:
+        raise RuntimeError(f"{action_id} failed: {[result.get_message() for result in connector.get_action_results()]}")
+
+    return connector, duration, peak_memory
+
+
+def benchmark_on_poll(options, config, alert_count):
+    with MockServer(
+        alerts=alert_count, latency=options.latency, payload_bytes=options.payload_bytes, throttle_rate=options.throttle_rate
+    ) as server:
+        BenchmarkConnector.use_api(server.url)
+        param = {"container_count": alert_count, "artifact_count": 1, "end_time": int(time.time() * 1000)}
+
+        connector, duration, _ = run_action(config, "on_poll", param)
+        if connector.container_count != alert_count:
+            raise RuntimeError(f"on poll ingested {connector.container_count} of {alert_count} alerts")
+
+        # Peak memory is measured on a separate run since tracing slows every allocation down
+        _, _, peak_memory = run_action(config, "on_poll", param, trace_memory=True)
+
+    return {
+        "seconds": round(duration, 3),
+        "alerts_per_second": round(alert_count / duration, 1),
+        "peak_memory_mb": round(peak_memory / 2**20, 2),
+    }
+
+
+def benchmark_hunts(options, config):
+    with MockServer(latency=options.latency, throttle_rate=options.throttle_rate) as server:
+        BenchmarkConnector.use_api(server.url)
+        durations = [run_action(config, "hunt_ioc", {"hunting": f"ioc{index}.example.com"})[1] for index in range(options.hunts)]
+
+        iocs = ",".join(f"bulk{index}.example.com" for index in range(options.hunts))
+        _, bulk_duration, _ = run_action(config, "hunt_iocs", {"iocs": iocs})
+
+    return {"hunt_ioc": get_percentiles(durations), "hunt_iocs": {"iocs": options.hunts, "seconds": round(bulk_duration, 3)}}
+
+
+def benchmark_enrichment(options, config):
+    with MockServer(latency=options.latency, throttle_rate=options.throttle_rate, enrichment_rounds=options.enrichment_rounds) as server:
+        BenchmarkConnector.use_api(server.url)
+        iocs = ",".join(f"enrich{index}.example.com" for index in range(options.enrichment_iocs))
+        param = {"iocs": iocs, "max_poll_cycles": options.enrichment_rounds + 2, "sleep_seconds": 0.1}
+        _, duration, _ = run_action(config, "enrich_ioc", param)
+
+    return {"iocs": options.enrichment_iocs, "seconds": round(duration, 3)}
+
+
+def benchmark_cold_start(options):
+    with MockServer(latency=options.latency) as server:
+        samples = []
+        for _ in range(options.cold_starts):
+            output = subprocess.run(
+                [sys.executable, os.path.join(BENCHMARKS_DIR, "cold_start.py"), server.url], capture_output=True, text=True, check=True
+            ).stdout
+            samples.append(json.loads(output))
+
+    import_ms = statistics.median(sample["import_ms"] for sample in samples)
+    hunt_ip_ms = statistics.median(sample["hunt_ip_ms"] for sample in samples)
+    return {"import_ms": import_ms, "hunt_ip_ms": hunt_ip_ms, "total_ms": round(import_ms + hunt_ip_ms, 2), "modules": samples[0]["modules"]}
+
+
+def get_regressions(results, baseline, tolerance, path=""):
+    """List the measurements of results that are worse than the baseline by more than tolerance."""
+    regressions = []
+    for key, value in results.items():
+        baseline_value = baseline.get(key) if isinstance(baseline, dict) else None
+        if isinstance(value, dict):
+            regressions += get_regressions(value, baseline_value, tolerance, f"{path}{key}.")
+        elif isinstance(value, (int, float)) and isinstance(baseline_value, (int, float)) and baseline_value > 0:
+            if key.endswith(HIGHER_IS_WORSE) and value > baseline_value * (1 + tolerance):
+                regressions.append(f"{path}{key}: {baseline_value} -> {value}")
+            elif key.endswith(LOWER_IS_WORSE) and value < baseline_value * (1 - tolerance):
+                regressions.append(f"{path}{key}: {baseline_value} -> {value}")
+
+    return regressions
+
+
+def get_argument_parser():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--alerts", default="100,1000,10000", help="comma-separated alert counts of the on poll benchmarks")
+    parser.add_argument("--hunts", type=int, default=200, help="number of IOCs hunted")
+    parser.add_argument("--enrichment-iocs", type=int, default=20, help="number of IOCs enriched together")
+    parser.add_argument("--enrichment-rounds", type=int, default=2, help="number of InProgress responses before an enrichment is done")
+    parser.add_argument("--latency", type=float, default=0.02, help="mean latency of the mock API, in seconds")
+    parser.add_argument("--payload-bytes", type=int, default=4096, help="size of the description of every alert")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of requests throttled by the mock API")
+    parser.add_argument("--cold-starts", type=int, default=5, help="number of cold start samples, the median is reported")
+    parser.add_argument("--max-workers", type=int, default=5, help="max_workers asset parameter")
+    parser.add_argument("--output", help="file to write the results to, as JSON")
+    parser.add_argument("--baseline", help="results of a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="accepted relative regression against the baseline")
+    return parser
+
+
+def main():
+    options = get_argument_parser().parse_args()
+    config = {
+        "account_id": "benchmark",
+        "api_key": "benchmark",
+        "max_workers": options.max_workers,
+        "requests_per_second": 0,
+        "retry_backoff_seconds": 0,
+        "ioc_cache_ttl": 0,
+        "ioc_cache_negative_ttl": 0,
+    }
+
+    results = {"on_poll": {}}
+    for alert_count in (int(count) for count in options.alerts.split(",")):
+        results["on_poll"][str(alert_count)] = benchmark_on_poll(options, config, alert_count)
+    results.update(benchmark_hunts(options, config))
+    results["enrich_ioc"] = benchmark_enrichment(options, config)
+    results["cold_start"] = benchmark_cold_start(options)
+
+    print(json.dumps(results, indent=4))
+    if options.output:
+        with open(options.output, "w") as f:
+            json.dump(results, f, indent=4)
+
+    if options.baseline:
+        with open(options.baseline) as f:
+            regressions = get_regressions(results, json.load(f), options.tolerance)
+        if regressions:
+            print("Regressions against the baseline:\n  " + "\n  ".join(regressions), file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
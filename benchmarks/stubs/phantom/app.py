@@ -0,0 +1,213 @@
+# File: benchmarks/stubs/phantom/app.py
+#
+# Copyright (c) 2019-2025 IntSights Cyber Intelligence Ltd.
+#
+# This unpublished material is proprietary to IntSights.
+# All rights reserved. The methods and
+# techniques described herein are considered trade secrets
+# and/or confidential. Reproduction or distribution, in whole
+# or in part, is forbidden except by express written permission
+# of IntSights.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+"""
+In-memory stand-in for the parts of the phantom.app module used by the connector.
+
+Only meant for the benchmarks: containers and artifacts are counted instead of stored,
+and the state is kept as JSON text like the platform does.
+"""
+
+import json
+import tempfile
+import threading
+
+
+APP_SUCCESS = True
+APP_ERROR = False
+
+
+def is_fail(status):
+    return not status
+
+
+def is_success(status):
+    return bool(status)
+
+
+class ActionResult:
+    def __init__(self, param=None):
+        self._param = param or {}
+        self._data = []
+        self._summary = {}
+        self._status = APP_ERROR
+        self._message = ""
+
+    def set_status(self, status, message="", exception=None):
+        self._status = status
+        self._message = message
+        return status
+
+    def get_status(self):
+        return self._status
+
+    def get_message(self):
+        return self._message
+
+    def add_data(self, data):
+        self._data.append(data)
+        return data
+
+    def get_data(self):
+        return self._data
+
+    def update_summary(self, summary):
+        self._summary.update(summary)
+        return self._summary
+
+    def set_summary(self, summary):
+        self._summary = summary
+
+    def get_summary(self):
+        return self._summary
+
+    def get_param(self):
+        return self._param
+
+
+class BaseConnector:
+    def __init__(self):
+        self._config = {}
+        self._action_id = None
+        self._action_results = []
+        self._status = APP_SUCCESS
+        self._message = ""
+        self._state_json = "{}"
+        self._state_dir = tempfile.mkdtemp(prefix="intsights_benchmark_")
+        self._is_poll_now = False
+        self._container_ids = {}
+        self._artifact_count = 0
+        self._lock = threading.Lock()
+
+    # Benchmark helpers
+
+    def configure(self, config, state=None, state_dir=None, is_poll_now=False):
+        """Set the asset configuration, the persisted state and the poll mode of the next action run."""
+        self._config = config
+        self._state_json = json.dumps(state or {})
+        self._state_dir = state_dir or self._state_dir
+        self._is_poll_now = is_poll_now
+
+    def run_action(self, action_id, param):
+        """Run an action like the platform does: initialize, handle_action and finalize."""
+        self._action_id = action_id
+        self._action_results = []
+        status = self.initialize()
+        if is_success(status):
+            status = self.handle_action(param)
+        self.finalize()
+        return status
+
+    @property
+    def container_count(self):
+        return len(self._container_ids)
+
+    @property
+    def artifact_count(self):
+        return self._artifact_count
+
+    @property
+    def state(self):
+        return json.loads(self._state_json)
+
+    # BaseConnector API
+
+    def get_config(self):
+        return self._config
+
+    def get_action_identifier(self):
+        return self._action_id
+
+    def get_asset_id(self):
+        return "benchmark"
+
+    def get_container_id(self):
+        return None
+
+    def get_state_dir(self):
+        return self._state_dir
+
+    def is_poll_now(self):
+        return self._is_poll_now
+
+    def load_state(self):
+        return json.loads(self._state_json)
+
+    def save_state(self, state):
+        self._state_json = json.dumps(state)
+
+    def add_action_result(self, action_result):
+        self._action_results.append(action_result)
+        return action_result
+
+    def get_action_results(self):
+        return self._action_results
+
+    def set_status(self, status, message="", exception=None):
+        self._status = status
+        self._message = message
+        return status
+
+    def get_status(self):
+        return self._status
+
+    def get_status_message(self):
+        return self._message
+
+    def debug_print(self, message, dump_object=""):
+        pass
+
+    def error_print(self, message, dump_object=""):
+        pass
+
+    def save_progress(self, message, *args, **kwargs):
+        pass
+
+    def send_progress(self, message, *args, **kwargs):
+        pass
+
+    def save_container(self, container):
+        with self._lock:
+            container_id = self._container_ids.get(container["source_data_identifier"])
+            if container_id:
+                return APP_SUCCESS, "Duplicate container found", container_id
+
+            container_id = len(self._container_ids) + 1
+            self._container_ids[container["source_data_identifier"]] = container_id
+            self._artifact_count += len(container.get("artifacts", []))
+
+        return APP_SUCCESS, "Container created", container_id
+
+    def save_containers(self, containers):
+        responses = []
+        for container in containers:
+            status, message, container_id = self.save_container(container)
+            responses.append({"success": is_success(status), "id": container_id, "message": message})
+
+        return APP_SUCCESS, "Containers saved", responses
+
+    def save_artifacts(self, artifacts):
+        with self._lock:
+            self._artifact_count += len(artifacts)
+            first_id = self._artifact_count - len(artifacts) + 1
+
+        return APP_SUCCESS, "Artifacts saved", list(range(first_id, first_id + len(artifacts)))
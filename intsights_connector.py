@@ -20,13 +20,24 @@
 # either express or implied. See the License for the specific language governing permissions
 # and limitations under the License.
 
+import hashlib
+import json
+import os
+import random
+import re
+import threading
 import time
+from collections import deque
+from datetime import datetime, timezone
 from urllib.parse import unquote
 
 # Phantom imports
 import phantom.app as phantom
 import requests
 from phantom.app import BaseConnector
+from requests.adapters import HTTPAdapter
+
+from intsights_utils import ActionMetrics, ConcurrencyLimiter, IocCache, TokenBucket, compile_field_mapping, get_retry_after_seconds
 
 
 class IntSightsConnector(BaseConnector):
@@ -59,6 +70,16 @@ class IntSightsConnector(BaseConnector):
     ACTION_ID_TAKEDOWN_REQUEST = "takedown_request"
     ACTION_ID_ENRICH_IOC = "enrich_ioc"
     ACTION_ID_HUNT_IOC = "hunt_ioc"
+    ACTION_ID_HUNT_IOCS = "hunt_iocs"
+    ACTION_ID_COLLECT_ENRICHMENTS = "collect_enrichments"
+    ACTION_ID_BULK_CLOSE_ALERTS = "bulk_close_alerts"
+    ACTION_ID_BULK_TAKEDOWN_REQUEST = "bulk_takedown_request"
+
+    # IOCs whose case does not matter: MD5, SHA1, SHA256 and SHA512 hashes, and domain names
+    INTSIGHTS_CASE_INSENSITIVE_IOC_REGEX = re.compile(
+        r"[0-9a-f]{32}|[0-9a-f]{40}|[0-9a-f]{64}|[0-9a-f]{128}|(?:[a-z0-9_](?:[a-z0-9_-]{0,61}[a-z0-9_])?\.)+[a-z0-9-]{2,63}\.?",
+        re.IGNORECASE,
+    )
 
     # Messages
     INTSIGHTS_CONNECTION_SUCCESSFUL = "Test Connectivity passed"
@@ -67,9 +88,15 @@ class IntSightsConnector(BaseConnector):
     INTSIGHTS_ERROR_AUTH = "Authentication error"
     INTSIGHTS_ERROR_CLOSE_ALERT = "Failed to close alert ID {alert_id}"
     INTSIGHTS_ERROR_TAKEDOWN_ALERT = "Failed to takedown alert ID {alert_id}"
+    INTSIGHTS_ERROR_NO_ALERT_IDS = "Please provide at least one alert ID in the '{param}' parameter"
     INTSIGHTS_ERROR_ENRICHMENT_TIMEOUT = "Enrichment calls timed out with the following last response: "
+    INTSIGHTS_ERROR_ENRICHMENT_TIMEOUT_MESSAGE = (
+        "Timeout occured on the enrichment API calls, see data for link to ongoing investigation enrichment"
+    )
+    INTSIGHTS_ERROR_NO_IOCS = "Please provide at least one IOC in the '{param}' parameter"
+    INTSIGHTS_ERROR_NO_ENRICH_IOCS = "Please provide an IOC in the 'ioc' parameter or a list of IOCs in the 'iocs' parameter"
+    INTSIGHTS_ERROR_GET_ALERT = "Failed to get IntSights alert ID {alert_id}. {error}"
     PHANTOM_ERROR_SAVE_CONTAINER = "An error occurred while creating container for IntSights alert ID {alert_id}"
-    PHANTOM_ERROR_SAVE_ARTIFACT = "An error occurred while creating artifact for IntSights alert ID {alert_id}"
     INTSIGHTS_ERROR_UNABLE_TO_PARSE_JSON_RESPONSE = "Unable to parse response as JSON. {error}"
     INTSIGHTS_ERROR_INVALID_RESPONSE = "Invalid response received from the server while fetching the list of alert ids"
     INTSIGHTS_ERROR_QUOTA_EXCEEDED = "Enrichment API responded with a Quota exceeded message"
@@ -82,11 +109,126 @@ class IntSightsConnector(BaseConnector):
     INTSIGHTS_VALID_INT_MESSAGE = "Please provide a valid integer value in the '{param}' parameter"
     INTSIGHTS_NON_NEG_NON_ZERO_INT_MESSAGE = "Please provide a valid non-zero positive integer value in '{param}' parameter"
     INTSIGHTS_NON_NEG_INT_MESSAGE = "Please provide a valid non-negative integer value in the '{param}' parameter"
+    INTSIGHTS_NON_NEG_NUMBER_MESSAGE = "Please provide a valid non-negative number in the '{param}' parameter"
+    INTSIGHTS_INVALID_DATE_MESSAGE = "Please provide a valid ISO 8601 date or epoch time (milliseconds) in the '{param}' parameter"
+    INTSIGHTS_INVALID_BACKFILL_RANGE_MESSAGE = "The 'backfill_start' parameter must be earlier than the 'backfill_end' parameter"
+    INTSIGHTS_INVALID_VALUE_LIST_MESSAGE = "Please provide a comma-separated list of values among {values} in the '{param}' parameter"
+    INTSIGHTS_INVALID_VALUE_MESSAGE = "Please provide one of {values} in the '{param}' parameter"
+    INTSIGHTS_MAX_INT_MESSAGE = "Please provide a value less than or equal to {max_value} in the '{param}' parameter"
+
+    # Asset configuration defaults
+    INTSIGHTS_DEFAULT_MAX_WORKERS = 5
+    INTSIGHTS_MAX_WORKERS_LIMIT = 25
+    INTSIGHTS_DEFAULT_MAX_RETRIES = 3
+    INTSIGHTS_DEFAULT_RETRY_BACKOFF_SECONDS = 1
+    INTSIGHTS_MAX_RETRY_WAIT_SECONDS = 120
+    INTSIGHTS_RETRY_STATUS_CODES = (429, 502, 503, 504)
+    INTSIGHTS_DEFAULT_REQUESTS_PER_SECOND = 10
+    INTSIGHTS_DEFAULT_CONNECTION_POOL_SIZE = 10
+    INTSIGHTS_DEFAULT_CONNECT_TIMEOUT = 10
+    INTSIGHTS_DEFAULT_READ_TIMEOUT = 60
+    INTSIGHTS_DEFAULT_FIRST_RUN_LOOKBACK_DAYS = 10
+    INTSIGHTS_DEFAULT_POLL_OVERLAP_MINUTES = 60
+    INTSIGHTS_MINUTE_IN_MILLISECONDS = 60000
+    INTSIGHTS_DEFAULT_CONTAINER_BATCH_SIZE = 100
+    INTSIGHTS_CONTAINER_BATCH_MAX_WAIT_SECONDS = 5
+    INTSIGHTS_DEFAULT_ARTIFACT_DATA_MAX_BYTES = 262144
+    INTSIGHTS_DEFAULT_ENRICHMENT_MAX_SLEEP_SECONDS = 30
+    INTSIGHTS_ENRICHMENT_BACKOFF_FACTOR = 2
+    INTSIGHTS_PENDING_ENRICHMENT_MAX_AGE_SECONDS = 86400
+    INTSIGHTS_DEFAULT_IOC_CACHE_TTL = 3600
+    INTSIGHTS_DEFAULT_IOC_CACHE_NEGATIVE_TTL = 300
+    INTSIGHTS_DEFAULT_IOC_CACHE_MAX_ENTRIES = 1000
+    INTSIGHTS_IOC_CACHE_DIR_NAME = "{asset_id}_ioc_cache"
+    INTSIGHTS_RATE_LIMIT_FILE_NAME = "{asset_id}_rate_limit.json"
+    INTSIGHTS_DEFAULT_INGESTED_ALERTS_MAX_COUNT = 10000
+    INTSIGHTS_DEFAULT_INGESTED_ALERTS_MAX_AGE_DAYS = 30
+    INTSIGHTS_DEFAULT_ALERT_MAX_ATTEMPTS = 3
+    INTSIGHTS_DEFAULT_REVISIT_ALERTS_MAX_COUNT = 0
+    INTSIGHTS_DEFAULT_BACKFILL_WINDOW_HOURS = 24
+    INTSIGHTS_DEFAULT_BACKFILL_MAX_ALERTS_PER_WINDOW = 500
+    INTSIGHTS_BACKFILL_MIN_WINDOW_MILLISECONDS = 3600000
+    INTSIGHTS_BACKFILL_MAX_WINDOW_MILLISECONDS = 604800000
+    INTSIGHTS_HOUR_IN_MILLISECONDS = 3600000
+    INTSIGHTS_DAY_IN_SECONDS = 86400
+    INTSIGHTS_DAY_IN_MILLISECONDS = 86400000
+
+    # Alert filters of the alerts-list endpoint
+    INTSIGHTS_ALERT_SEVERITIES = ("High", "Medium", "Low")
+    INTSIGHTS_ALERT_TYPES = ("AttackIndication", "DataLeakage", "Phishing", "BrandSecurity", "ExploitableData", "vip")
+    INTSIGHTS_ALERT_SOURCE_TYPES = ("ApplicationStores", "BlackMarkets", "HackingForums", "SocialMedia", "PasteSites", "Others")
+    INTSIGHTS_ALERT_STATUS_FILTERS = {"All": None, "Open": "false", "Closed": "true"}
+    INTSIGHTS_ALERT_ASSIGNED_FILTERS = {"All": None, "Assigned": "true", "Unassigned": "false"}
+
+    # Artifact fields of an alert, as paths in the alert (see intsights_utils.compile_field_mapping)
+    INTSIGHTS_ALERT_ARTIFACT_MAPPING = {
+        "name": "Details.Title",
+        "description": "Details.Description",
+        "type": "Details.Type",
+        "severity": "Details.Severity",
+        "start_time": "FoundDate",
+        "source_data_identifier": "_id",
+    }
+    INTSIGHTS_ALERT_CEF_MAPPING = {
+        "Subtype": "Details.SubType",
+        "Assets": "Assets[].Value",
+        "Tags": "Details.Tags[].Name",
+        "Source Date": "Details.Source.Date",
+        "destinationDnsDomain": "Assets[Type=Domains|SubDomains][0].Value",
+        "destinationAddress": "Assets[Type=IPs][0].Value",
+    }
+    INTSIGHTS_ALERT_CEF_TYPES = {
+        "destinationDnsDomain": ["domain"],
+        "destinationAddress": ["ip"],
+    }
+
+    # Actions reading or writing the persisted connector state, it is not loaded for the other ones
+    INTSIGHTS_STATEFUL_ACTIONS = (ACTION_ID_ON_POLL, ACTION_ID_ENRICH_IOC, ACTION_ID_COLLECT_ENRICHMENTS)
+
+    # Keys of the persisted connector state
+    STATE_LAST_FOUND_DATE = "last_found_date"
+    STATE_INGESTED_ALERTS = "ingested_alerts"
+    STATE_FAILED_ALERTS = "failed_alerts"
+    STATE_PENDING_ENRICHMENTS = "pending_enrichments"
+    STATE_BACKFILL = "backfill"
 
     def __init__(self):
         """Initialize global variables."""
         super().__init__()
         self._session = None
+        self._state = None
+        self._ioc_cache = None
+        self._metrics = ActionMetrics()
+        self._get_artifact_fields = None
+        self._get_artifact_cef = None
+        self._session_lock = threading.Lock()
+        self._ioc_cache_lock = threading.Lock()
+        self._requests_per_second = self.INTSIGHTS_DEFAULT_REQUESTS_PER_SECOND
+        self._connection_pool_size = self.INTSIGHTS_DEFAULT_CONNECTION_POOL_SIZE
+        self._submitted_enrichments = {}
+        self._collected_enrichments = set()
+        self._max_workers = self.INTSIGHTS_DEFAULT_MAX_WORKERS
+        self._max_retries = self.INTSIGHTS_DEFAULT_MAX_RETRIES
+        self._retry_backoff_seconds = self.INTSIGHTS_DEFAULT_RETRY_BACKOFF_SECONDS
+        self._rate_limiter = None
+        self._concurrency_limiter = None
+        self._timeout = (self.INTSIGHTS_DEFAULT_CONNECT_TIMEOUT, self.INTSIGHTS_DEFAULT_READ_TIMEOUT)
+        self._first_run_lookback_days = self.INTSIGHTS_DEFAULT_FIRST_RUN_LOOKBACK_DAYS
+        self._poll_overlap_minutes = self.INTSIGHTS_DEFAULT_POLL_OVERLAP_MINUTES
+        self._container_batch_size = self.INTSIGHTS_DEFAULT_CONTAINER_BATCH_SIZE
+        self._artifact_data_max_bytes = self.INTSIGHTS_DEFAULT_ARTIFACT_DATA_MAX_BYTES
+        self._alert_filters = {}
+        self._revisit_alerts_max_count = self.INTSIGHTS_DEFAULT_REVISIT_ALERTS_MAX_COUNT
+        self._backfill_start = None
+        self._backfill_end = None
+        self._backfill_window_hours = self.INTSIGHTS_DEFAULT_BACKFILL_WINDOW_HOURS
+        self._backfill_max_alerts_per_window = self.INTSIGHTS_DEFAULT_BACKFILL_MAX_ALERTS_PER_WINDOW
+        self._ingested_alerts_max_count = self.INTSIGHTS_DEFAULT_INGESTED_ALERTS_MAX_COUNT
+        self._ingested_alerts_max_age_days = self.INTSIGHTS_DEFAULT_INGESTED_ALERTS_MAX_AGE_DAYS
+        self._alert_max_attempts = self.INTSIGHTS_DEFAULT_ALERT_MAX_ATTEMPTS
+        self._ioc_cache_ttl = self.INTSIGHTS_DEFAULT_IOC_CACHE_TTL
+        self._ioc_cache_negative_ttl = self.INTSIGHTS_DEFAULT_IOC_CACHE_NEGATIVE_TTL
+        self._ioc_cache_max_entries = self.INTSIGHTS_DEFAULT_IOC_CACHE_MAX_ENTRIES
 
     def _get_error_message_from_exception(self, e):
         """
@@ -141,41 +283,412 @@ class IntSightsConnector(BaseConnector):
 
         return phantom.APP_SUCCESS, parameter
 
+    def _validate_number(self, action_result, parameter, key):
+        """
+        Validate a non-negative number.
+
+        :param action_result: Action result or BaseConnector object
+        :param parameter: input parameter
+        :param key: input parameter message key
+        :return: status phantom.APP_ERROR/phantom.APP_SUCCESS, float value of the parameter or None in case of failure
+        """
+        try:
+            parameter = float(parameter)
+        except Exception:
+            return action_result.set_status(phantom.APP_ERROR, self.INTSIGHTS_NON_NEG_NUMBER_MESSAGE.format(param=key)), None
+
+        if parameter < 0:
+            return action_result.set_status(phantom.APP_ERROR, self.INTSIGHTS_NON_NEG_NUMBER_MESSAGE.format(param=key)), None
+
+        return phantom.APP_SUCCESS, parameter
+
+    def _validate_date(self, action_result, parameter, key):
+        """
+        Validate a date.
+
+        :param action_result: Action result or BaseConnector object
+        :param parameter: input parameter, an ISO 8601 date (UTC unless it has an offset) or an epoch time in milliseconds
+        :param key: input parameter message key
+        :return: status phantom.APP_ERROR/phantom.APP_SUCCESS, epoch time (milliseconds) of the parameter or None in case of failure
+        """
+        if parameter is None or (isinstance(parameter, str) and not parameter.strip()):
+            return phantom.APP_SUCCESS, None
+
+        try:
+            if isinstance(parameter, (int, float)) or parameter.strip().isdigit():
+                return phantom.APP_SUCCESS, int(parameter)
+
+            date = datetime.fromisoformat(parameter.strip().replace("Z", "+00:00"))
+        except Exception:
+            return action_result.set_status(phantom.APP_ERROR, self.INTSIGHTS_INVALID_DATE_MESSAGE.format(param=key)), None
+
+        if date.tzinfo is None:
+            date = date.replace(tzinfo=timezone.utc)
+
+        return phantom.APP_SUCCESS, int(date.timestamp() * 1000)
+
+    def _validate_value_list(self, action_result, parameter, key, values):
+        """
+        Validate a comma-separated list of values, ignoring case.
+
+        :param action_result: Action result or BaseConnector object
+        :param parameter: input parameter
+        :param key: input parameter message key
+        :param values: allowed values
+        :return: status phantom.APP_ERROR/phantom.APP_SUCCESS, comma-separated values or None in case of failure or empty parameter
+        """
+        if not parameter:
+            return phantom.APP_SUCCESS, None
+
+        allowed_values = {value.lower(): value for value in values}
+        try:
+            selected_values = [allowed_values[value.lower()] for value in self._get_list_from_string(parameter)]
+        except KeyError:
+            return action_result.set_status(
+                phantom.APP_ERROR, self.INTSIGHTS_INVALID_VALUE_LIST_MESSAGE.format(values=", ".join(values), param=key)
+            ), None
+
+        return phantom.APP_SUCCESS, ",".join(selected_values) or None
+
     def initialize(self):
         """Initialize the global variables with its value and validate it."""
         config = self.get_config()
 
-        session = requests.Session()
-        session.headers.update(
-            {
-                "Accept": "application/json",
-                "X-App-Name": "Phantom_1.0",
-            }
+        ret_val, self._max_workers = self._validate_integer(self, config.get("max_workers", self.INTSIGHTS_DEFAULT_MAX_WORKERS), "max_workers")
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+        if self._max_workers > self.INTSIGHTS_MAX_WORKERS_LIMIT:
+            return self.set_status(
+                phantom.APP_ERROR, self.INTSIGHTS_MAX_INT_MESSAGE.format(max_value=self.INTSIGHTS_MAX_WORKERS_LIMIT, param="max_workers")
+            )
+
+        ret_val, self._max_retries = self._validate_integer(
+            self, config.get("max_retries", self.INTSIGHTS_DEFAULT_MAX_RETRIES), "max_retries", allow_zero=True
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        ret_val, self._retry_backoff_seconds = self._validate_number(
+            self, config.get("retry_backoff_seconds", self.INTSIGHTS_DEFAULT_RETRY_BACKOFF_SECONDS), "retry_backoff_seconds"
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        ret_val, self._requests_per_second = self._validate_number(
+            self, config.get("requests_per_second", self.INTSIGHTS_DEFAULT_REQUESTS_PER_SECOND), "requests_per_second"
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        ret_val, self._connection_pool_size = self._validate_integer(
+            self, config.get("connection_pool_size", self.INTSIGHTS_DEFAULT_CONNECTION_POOL_SIZE), "connection_pool_size"
         )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        ret_val, connect_timeout = self._validate_number(
+            self, config.get("connect_timeout", self.INTSIGHTS_DEFAULT_CONNECT_TIMEOUT), "connect_timeout"
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        ret_val, read_timeout = self._validate_number(self, config.get("read_timeout", self.INTSIGHTS_DEFAULT_READ_TIMEOUT), "read_timeout")
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        # A timeout of 0 waits forever, as requests did before timeouts were configurable
+        self._timeout = (connect_timeout or None, read_timeout or None)
+
+        ret_val, self._first_run_lookback_days = self._validate_integer(
+            self, config.get("first_run_lookback_days", self.INTSIGHTS_DEFAULT_FIRST_RUN_LOOKBACK_DAYS), "first_run_lookback_days"
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        ret_val, self._poll_overlap_minutes = self._validate_integer(
+            self, config.get("poll_overlap_minutes", self.INTSIGHTS_DEFAULT_POLL_OVERLAP_MINUTES), "poll_overlap_minutes", allow_zero=True
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        ret_val, self._container_batch_size = self._validate_integer(
+            self, config.get("container_batch_size", self.INTSIGHTS_DEFAULT_CONTAINER_BATCH_SIZE), "container_batch_size"
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        ret_val, self._artifact_data_max_bytes = self._validate_integer(
+            self,
+            config.get("artifact_data_max_bytes", self.INTSIGHTS_DEFAULT_ARTIFACT_DATA_MAX_BYTES),
+            "artifact_data_max_bytes",
+            allow_zero=True,
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        # Alerts-list filters, so that alerts which would not be ingested are never downloaded
+        for key, filter_name, values in (
+            ("alert_severity", "severity", self.INTSIGHTS_ALERT_SEVERITIES),
+            ("alert_type", "alertType", self.INTSIGHTS_ALERT_TYPES),
+            ("alert_source_type", "sourceType", self.INTSIGHTS_ALERT_SOURCE_TYPES),
+        ):
+            ret_val, value = self._validate_value_list(self, config.get(key), key, values)
+            if phantom.is_fail(ret_val):
+                return self.get_status()
+            if value:
+                self._alert_filters[filter_name] = value
+
+        for key, filter_name, values in (
+            ("alert_status", "isClosed", self.INTSIGHTS_ALERT_STATUS_FILTERS),
+            ("alert_assigned", "assigned", self.INTSIGHTS_ALERT_ASSIGNED_FILTERS),
+        ):
+            value = config.get(key) or "All"
+            if value not in values:
+                return self.set_status(phantom.APP_ERROR, self.INTSIGHTS_INVALID_VALUE_MESSAGE.format(values=", ".join(values), param=key))
+            if values[value]:
+                self._alert_filters[filter_name] = values[value]
+
+        ret_val, self._revisit_alerts_max_count = self._validate_integer(
+            self,
+            config.get("revisit_alerts_max_count", self.INTSIGHTS_DEFAULT_REVISIT_ALERTS_MAX_COUNT),
+            "revisit_alerts_max_count",
+            True,
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        ret_val, self._backfill_start = self._validate_date(self, config.get("backfill_start"), "backfill_start")
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        ret_val, self._backfill_end = self._validate_date(self, config.get("backfill_end"), "backfill_end")
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        if self._backfill_start and self._backfill_end and self._backfill_start >= self._backfill_end:
+            return self.set_status(phantom.APP_ERROR, self.INTSIGHTS_INVALID_BACKFILL_RANGE_MESSAGE)
 
-        account_id = config["account_id"].encode("utf8")
-        session.auth = requests.auth.HTTPBasicAuth(
-            account_id,
-            config["api_key"],
+        ret_val, self._backfill_window_hours = self._validate_integer(
+            self, config.get("backfill_window_hours", self.INTSIGHTS_DEFAULT_BACKFILL_WINDOW_HOURS), "backfill_window_hours"
         )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
 
-        self._session = session
+        ret_val, self._backfill_max_alerts_per_window = self._validate_integer(
+            self,
+            config.get("backfill_max_alerts_per_window", self.INTSIGHTS_DEFAULT_BACKFILL_MAX_ALERTS_PER_WINDOW),
+            "backfill_max_alerts_per_window",
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        ret_val, self._ingested_alerts_max_count = self._validate_integer(
+            self, config.get("ingested_alerts_max_count", self.INTSIGHTS_DEFAULT_INGESTED_ALERTS_MAX_COUNT), "ingested_alerts_max_count"
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        ret_val, self._ingested_alerts_max_age_days = self._validate_integer(
+            self,
+            config.get("ingested_alerts_max_age_days", self.INTSIGHTS_DEFAULT_INGESTED_ALERTS_MAX_AGE_DAYS),
+            "ingested_alerts_max_age_days",
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        ret_val, self._alert_max_attempts = self._validate_integer(
+            self, config.get("alert_max_attempts", self.INTSIGHTS_DEFAULT_ALERT_MAX_ATTEMPTS), "alert_max_attempts"
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        ret_val, self._ioc_cache_ttl = self._validate_integer(
+            self, config.get("ioc_cache_ttl", self.INTSIGHTS_DEFAULT_IOC_CACHE_TTL), "ioc_cache_ttl", allow_zero=True
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        ret_val, self._ioc_cache_negative_ttl = self._validate_integer(
+            self, config.get("ioc_cache_negative_ttl", self.INTSIGHTS_DEFAULT_IOC_CACHE_NEGATIVE_TTL), "ioc_cache_negative_ttl", allow_zero=True
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        ret_val, self._ioc_cache_max_entries = self._validate_integer(
+            self, config.get("ioc_cache_max_entries", self.INTSIGHTS_DEFAULT_IOC_CACHE_MAX_ENTRIES), "ioc_cache_max_entries"
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        if self.get_action_identifier() in self.INTSIGHTS_STATEFUL_ACTIONS:
+            self._state = self.load_state()
+            if not isinstance(self._state, dict):
+                self.debug_print("Resetting the state file with the default format")
+                self._state = {}
 
         return phantom.APP_SUCCESS
 
+    def _get_session(self):
+        """
+        Get the HTTP session of the action run, creating it with the rate and concurrency limiters on the first request.
+
+        :return: requests.Session object
+        """
+        with self._session_lock:
+            if self._session:
+                return self._session
+
+            config = self.get_config()
+            session = requests.Session()
+            session.headers.update(
+                {
+                    "Accept": "application/json",
+                    "X-App-Name": "Phantom_1.0",
+                }
+            )
+            if not config.get("keep_alive", True):
+                session.headers["Connection"] = "close"
+
+            # Every worker thread needs its own connection, otherwise they wait on connection checkout
+            # or open connections that are thrown away, paying a new TLS handshake each time
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(self._connection_pool_size, self._max_workers))
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+
+            account_id = config["account_id"].encode("utf8")
+            session.auth = requests.auth.HTTPBasicAuth(
+                account_id,
+                config["api_key"],
+            )
+
+            if self._requests_per_second:
+                # The bucket is shared by the concurrent action runs of the asset, which use the same API quota
+                rate_limit_path = os.path.join(self.get_state_dir(), self.INTSIGHTS_RATE_LIMIT_FILE_NAME.format(asset_id=self.get_asset_id()))
+                self._rate_limiter = TokenBucket(self._requests_per_second, path=rate_limit_path)
+            if config.get("adaptive_concurrency", True):
+                self._concurrency_limiter = ConcurrencyLimiter(self._max_workers)
+            self._session = session
+            return session
+
+    def _get_thread_pool(self, max_workers):
+        """
+        Create a pool of worker threads.
+
+        :param max_workers: number of threads
+        :return: concurrent.futures.ThreadPoolExecutor object
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        return ThreadPoolExecutor(max_workers=max_workers)
+
     def finalize(self):
         """Perform some final operations or clean up operations."""
+        # The state is only loaded once the asset configuration is validated
+        if self._state is not None:
+            if self.get_action_identifier() == self.ACTION_ID_ON_POLL:
+                self._state[self.STATE_PENDING_ENRICHMENTS] = self._merge_pending_enrichments(self.load_state())
+                self.save_state(self._state)
+            elif self._submitted_enrichments or self._collected_enrichments:
+                # The other actions only change the pending enrichments, the rest of the state may have
+                # been updated by a poll in the meantime and is saved as it is now
+                latest_state = self.load_state()
+                if not isinstance(latest_state, dict):
+                    latest_state = {}
+                latest_state[self.STATE_PENDING_ENRICHMENTS] = self._merge_pending_enrichments(latest_state)
+                self.save_state(latest_state)
+
+        if self._ioc_cache:
+            try:
+                self._ioc_cache.save()
+            except Exception as e:
+                self.debug_print(f"Unable to save the IOC cache. {self._get_error_message_from_exception(e)}")
+
+        if self._session:
+            self._session.close()
         self._session = None
 
         return phantom.APP_SUCCESS
 
+    def _get_retry_wait_seconds(self, attempt, response):
+        """
+        Get the time to wait before retrying a request.
+
+        The Retry-After header sent with throttled responses takes precedence over the
+        jittered exponential backoff.
+
+        :param attempt: number of the failed attempt, starting at 0
+        :param response: response of the failed attempt or None if the request raised an exception
+        :return: number of seconds to wait
+        """
+        if response is not None:
+            retry_after = get_retry_after_seconds(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                return min(retry_after, self.INTSIGHTS_MAX_RETRY_WAIT_SECONDS)
+
+        backoff = min(self._retry_backoff_seconds * (2**attempt), self.INTSIGHTS_MAX_RETRY_WAIT_SECONDS)
+        return random.uniform(backoff / 2, backoff)
+
+    def _make_rest_call(self, method, url, endpoint, **kwargs):
+        """
+        Make a request to IntSights, retrying throttled requests, transient server errors and connection failures.
+
+        Every attempt waits for a slot of the adaptive concurrency limiter and a token of the rate limiter,
+        both shared by the threads of the action run, and reports its latency or overload to the concurrency limiter.
+        The call is recorded in the action metrics once, with the latency of all its attempts.
+
+        :param method: HTTP method
+        :param url: request URL
+        :param endpoint: endpoint name used in the action metrics
+        :param kwargs: keyword arguments of requests.Session.request
+        :return: response of the last attempt
+        """
+        session = self._get_session()
+        kwargs.setdefault("timeout", self._timeout)
+        started = time.monotonic()
+        for attempt in range(self._max_retries + 1):
+            ticket = None
+            if self._concurrency_limiter:
+                with self._metrics.timer("concurrency_limit_wait"):
+                    ticket = self._concurrency_limiter.acquire()
+            if self._rate_limiter:
+                with self._metrics.timer("rate_limit_wait"):
+                    self._rate_limiter.acquire()
+
+            attempt_started = time.monotonic()
+            try:
+                response = session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if ticket is not None:
+                    self._concurrency_limiter.release(ticket, overloaded=isinstance(e, requests.Timeout))
+                if attempt == self._max_retries:
+                    self._metrics.record_call(endpoint, time.monotonic() - started, retries=attempt, error=True)
+                    raise
+                self.debug_print(f"Retrying {method.upper()} request after error: {self._get_error_message_from_exception(e)}")
+                time.sleep(self._get_retry_wait_seconds(attempt, None))
+                continue
+            except Exception:
+                if ticket is not None:
+                    self._concurrency_limiter.release(ticket)
+                raise
+
+            if ticket is not None:
+                overloaded = response.status_code == 429 or response.status_code >= 500
+                self._concurrency_limiter.release(ticket, None if overloaded else time.monotonic() - attempt_started, overloaded)
+
+            if response.status_code not in self.INTSIGHTS_RETRY_STATUS_CODES or attempt == self._max_retries:
+                self._metrics.record_call(endpoint, time.monotonic() - started, len(response.content), attempt)
+                return response
+
+            self.debug_print(f"Retrying {method.upper()} request after status code {response.status_code}")
+            time.sleep(self._get_retry_wait_seconds(attempt, response))
+
     def _test_asset_connectivity(self):
         self.debug_print("Starting connectivity test")
 
         action_result = self.add_action_result(phantom.ActionResult())
 
         try:
-            response = self._session.get(self.INTSIGHTS_GET_API_VERSION_URL)
+            response = self._make_rest_call("get", self.INTSIGHTS_GET_API_VERSION_URL, "version")
             if response.status_code == 401:
                 return action_result.set_status(phantom.APP_ERROR, self.INTSIGHTS_ERROR_AUTH)
 
@@ -190,15 +703,70 @@ class IntSightsConnector(BaseConnector):
         self.save_progress(self.INTSIGHTS_CONNECTION_SUCCESSFUL)
         return action_result.set_status(phantom.APP_SUCCESS)
 
+    def _get_ioc_cache(self):
+        """Get the IOC lookup cache shared by the threads of the action run, or None when caching is disabled."""
+        with self._ioc_cache_lock:
+            if self._ioc_cache is None and (self._ioc_cache_ttl or self._ioc_cache_negative_ttl):
+                cache_path = os.path.join(self.get_state_dir(), self.INTSIGHTS_IOC_CACHE_DIR_NAME.format(asset_id=self.get_asset_id()))
+                self._ioc_cache = IocCache(cache_path, self._ioc_cache_ttl, self._ioc_cache_negative_ttl, self._ioc_cache_max_entries)
+
+            return self._ioc_cache
+
     def _search_ioc(self, value, action_result):
         self.save_progress("Searching for IOC value: " + value)
 
+        ioc_cache = self._get_ioc_cache()
+        if not ioc_cache:
+            action_result.update_summary({"cache_hit": False})
+            return self._get_ioc(value, action_result, None)
+
+        is_cached, ioc_data = ioc_cache.get(value)
+        if not is_cached:
+            # Concurrent lookups of the IOC, in this or other action runs, wait for this one and reuse its result
+            with ioc_cache.lock(value) as locked:
+                if not locked:
+                    self.debug_print(f"Unable to lock the IOC cache entry of {value}, looking it up without waiting for other action runs")
+                is_cached, ioc_data = ioc_cache.get(value)
+                if not is_cached:
+                    action_result.update_summary({"cache_hit": False})
+                    self._metrics.record_cache("ioc", False)
+                    return self._get_ioc(value, action_result, ioc_cache)
+
+        action_result.update_summary({"cache_hit": True})
+        self._metrics.record_cache("ioc", True)
+        if ioc_data is None:
+            return action_result.set_status(phantom.APP_SUCCESS, self.INTSIGHTS_ERROR_NO_CONTENT), None
+
+        ioc_data = dict(ioc_data)
+        ioc_data["InvestigationLink"] = self.INTSIGHTS_INVESTIGATION_LINK_URL.format(ioc=value)
+        return phantom.APP_SUCCESS, ioc_data
+
+    def _cache_ioc(self, ioc_cache, value, ioc_data):
+        """Add a lookup to the IOC cache, a cache that cannot be written only loses the lookup for later runs."""
+        if not ioc_cache:
+            return
+
+        try:
+            ioc_cache.set(value, ioc_data)
+        except OSError as e:
+            self.debug_print(f"Unable to cache the lookup of {value}. {self._get_error_message_from_exception(e)}")
+
+    def _get_ioc(self, value, action_result, ioc_cache):
+        """
+        Look an IOC up in IntSights.
+
+        :param value: IOC value
+        :param action_result: action result of the lookup
+        :param ioc_cache: IOC cache the lookup is added to or None
+        :return: status phantom.APP_ERROR/phantom.APP_SUCCESS, IOC data or None
+        """
         try:
-            response = self._session.get(self.INTSIGHTS_SEARCH_IOC_URL, params={"iocValue": value})
+            response = self._make_rest_call("get", self.INTSIGHTS_SEARCH_IOC_URL, "ioc-by-value", params={"iocValue": value})
             if response.status_code == 204:
+                self._cache_ioc(ioc_cache, value, None)
                 return action_result.set_status(phantom.APP_SUCCESS, self.INTSIGHTS_ERROR_NO_CONTENT), None
             response.raise_for_status()
-        except requests.HTTPError as e:
+        except requests.RequestException as e:
             error_message = unquote(self._get_error_message_from_exception(e))
             return action_result.set_status(phantom.APP_ERROR, self.INTSIGHTS_ERROR_CONNECTION.format(error=error_message)), None
 
@@ -210,6 +778,8 @@ class IntSightsConnector(BaseConnector):
                 phantom.APP_ERROR, self.INTSIGHTS_ERROR_UNABLE_TO_PARSE_JSON_RESPONSE.format(error=error_message)
             ), None
 
+        self._cache_ioc(ioc_cache, value, dict(ioc_data))
+
         ioc_data["InvestigationLink"] = self.INTSIGHTS_INVESTIGATION_LINK_URL.format(ioc=value)
 
         return phantom.APP_SUCCESS, ioc_data
@@ -279,46 +849,178 @@ class IntSightsConnector(BaseConnector):
         action_result.add_data(results)
         return action_result.set_status(phantom.APP_SUCCESS, "URL information retrieved")
 
-    def _get_artifact(self, alert):
-        cef = {
-            "Subtype": alert.get("Details", {}).get("SubType"),
-        }
+    def _get_list_from_string(self, value):
+        """
+        Split a comma-separated parameter into a list of unique values.
+
+        :param value: comma-separated string or list of values
+        :return: list of stripped, non-empty values in their original order
+        """
+        if isinstance(value, str):
+            value = value.split(",")
+
+        values = (str(item).strip().strip("'\"").strip() for item in value if item is not None)
+        return list(dict.fromkeys(item for item in values if item))
+
+    def _get_iocs_from_string(self, value):
+        """
+        Split a comma-separated parameter into a list of unique IOCs.
 
-        assets = [asset.get("Value") for asset in alert.get("Assets")]
-        if assets:
-            cef["Assets"] = assets
+        Domains and hashes are case-folded before removing duplicates, so that 'A.com' and 'a.com' are looked up once.
+        URLs are kept as they are, since their path and query are case-sensitive.
 
-        tags = [tag.get("Name") for tag in alert.get("Details", {}).get("Tags")]
-        if tags:
-            cef["Tags"] = tags
+        :param value: comma-separated string or list of IOCs
+        :return: list of unique IOCs in their original order
+        """
+        return list(dict.fromkeys(self._normalize_ioc(ioc) for ioc in self._get_list_from_string(value)))
 
-        source_date = alert.get("Details", {}).get("Source", {}).get("Date", "")
-        if source_date:
-            cef["Source Date"] = source_date
+    def _normalize_ioc(self, ioc):
+        return ioc.lower() if self.INTSIGHTS_CASE_INSENSITIVE_IOC_REGEX.fullmatch(ioc) else ioc
 
+    def _hunt_iocs(self, param):
+        self.debug_print("Starting bulk IOC hunt")
+        action_result = self.add_action_result(phantom.ActionResult(dict(param)))
+
+        iocs = self._get_iocs_from_string(param["iocs"])
+        if not iocs:
+            return action_result.set_status(phantom.APP_ERROR, self.INTSIGHTS_ERROR_NO_IOCS.format(param="iocs"))
+
+        def search_ioc(ioc):
+            # Every lookup gets its own action result so that statuses do not overwrite each other
+            ioc_action_result = phantom.ActionResult()
+            try:
+                ret_val, ioc_data = self._search_ioc(ioc, ioc_action_result)
+            except Exception as e:
+                error_message = self._get_error_message_from_exception(e)
+                ret_val, ioc_data = (
+                    ioc_action_result.set_status(phantom.APP_ERROR, self.INTSIGHTS_ERROR_CONNECTION.format(error=error_message)),
+                    None,
+                )
+            return ioc, ret_val, ioc_data, ioc_action_result
+
+        summary = {"total_iocs": len(iocs), "found_iocs": 0, "not_found_iocs": 0, "failed_iocs": 0, "cache_hits": 0}
+
+        with self._get_thread_pool(min(self._max_workers, len(iocs))) as executor:
+            for ioc, ret_val, ioc_data, ioc_action_result in executor.map(search_ioc, iocs):
+                cache_hit = bool(ioc_action_result.get_summary().get("cache_hit"))
+                if phantom.is_fail(ret_val):
+                    summary["failed_iocs"] += 1
+                elif ioc_data:
+                    summary["found_iocs"] += 1
+                else:
+                    summary["not_found_iocs"] += 1
+                summary["cache_hits"] += cache_hit
+
+                action_result.add_data(
+                    {
+                        "ioc": ioc,
+                        "status": "success" if phantom.is_success(ret_val) else "failed",
+                        "found": bool(ioc_data),
+                        "cache_hit": cache_hit,
+                        "message": ioc_action_result.get_message() or "IOC information retrieved",
+                        "result": ioc_data or {},
+                    }
+                )
+
+        action_result.update_summary(summary)
+
+        if summary["failed_iocs"] == len(iocs):
+            return action_result.set_status(phantom.APP_ERROR, f"Failed to hunt {len(iocs)} IOC(s)")
+
+        return action_result.set_status(phantom.APP_SUCCESS, f"Found {summary['found_iocs']} of {len(iocs)} IOC(s)")
+
+    def _get_artifact(self, alert, data=None):
+        """
+        Build the artifact of an alert from the compiled INTSIGHTS_ALERT_ARTIFACT_MAPPING and INTSIGHTS_ALERT_CEF_MAPPING.
+
+        :param alert: alert dictionary, missing fields are left out of the CEF
+        :param data: artifact data, the alert itself when None
+        :return: artifact dictionary
+        """
+        if self._get_artifact_cef is None:
+            self._get_artifact_fields = compile_field_mapping(self.INTSIGHTS_ALERT_ARTIFACT_MAPPING)
+            self._get_artifact_cef = compile_field_mapping(self.INTSIGHTS_ALERT_CEF_MAPPING, skip_empty=True)
+
+        cef = self._get_artifact_cef(alert)
         artifact = {
             "label": "IntSights Alert",
-            "name": alert.get("Details", {}).get("Title"),
-            "description": alert.get("Details", {}).get("Description"),
-            "type": alert.get("Details", {}).get("Type"),
-            "severity": alert.get("Details", {}).get("Severity"),
-            "start_time": alert.get("FoundDate"),
-            "source_data_identifier": alert.get("_id"),
-            "data": alert,
+            **self._get_artifact_fields(alert),
+            "data": alert if data is None else data,
             "cef": cef,
+            "cef_types": {key: cef_types for key, cef_types in self.INTSIGHTS_ALERT_CEF_TYPES.items() if key in cef},
         }
 
         return artifact
 
-    def _get_alert_ids(self, param, action_result):
+    def _get_poll_start_time(self, end_time):
+        """
+        Get the start of the on_poll time range.
+
+        Scheduled polls continue from the persisted high-water mark, while the first run and manual
+        polls look back 'first_run_lookback_days' days. The range of a scheduled poll starts
+        'poll_overlap_minutes' before the mark, to list the alerts that IntSights made visible after
+        the previous poll with an earlier found date. The alerts listed twice are skipped by the
+        ingested alerts index without being downloaded again.
+
+        :param end_time: end of the time range, in epoch time (milliseconds)
+        :return: start of the time range, in epoch time (milliseconds)
+        """
+        last_found_date = self._state.get(self.STATE_LAST_FOUND_DATE)
+        if last_found_date and not self.is_poll_now():
+            return min(last_found_date - (self._poll_overlap_minutes * self.INTSIGHTS_MINUTE_IN_MILLISECONDS), end_time)
+
+        return end_time - (self._first_run_lookback_days * self.INTSIGHTS_DAY_IN_MILLISECONDS)
+
+    def _update_poll_checkpoint(self, end_time, is_complete):
+        """
+        Persist the on_poll high-water mark.
+
+        The mark only moves forward when every listed alert was ingested or failed 'alert_max_attempts' times.
+        Otherwise the same range is listed again on the next poll and the alerts ingested so far are skipped
+        by the ingested alerts index.
+
+        :param end_time: end of the polled time range, in epoch time (milliseconds)
+        :param is_complete: whether all the alerts of the time range were ingested or given up on
+        """
+        if is_complete:
+            self._state[self.STATE_LAST_FOUND_DATE] = end_time
+
+    def _prune_ingested_alerts(self):
+        """
+        Evict entries older than 'ingested_alerts_max_age_days' and keep at most 'ingested_alerts_max_count' of the newest.
+
+        Every entry holds the ingestion time, the content hash of the alert, its container ID and the
+        last time the alert was revisited. Entries of older versions, holding only the ingestion time,
+        are converted but never revisited since their container is unknown.
+
+        The failure counts of the alerts that could not be ingested expire after the same number of days.
+        """
+        min_ingest_time = int(time.time()) - (self._ingested_alerts_max_age_days * self.INTSIGHTS_DAY_IN_SECONDS)
+        self._state[self.STATE_FAILED_ALERTS] = {
+            alert_id: entry for alert_id, entry in self._state.get(self.STATE_FAILED_ALERTS, {}).items() if entry["time"] >= min_ingest_time
+        }
+
+        ingested_alerts = {}
+        for alert_id, entry in self._state.get(self.STATE_INGESTED_ALERTS, {}).items():
+            if not isinstance(entry, dict):
+                entry = {"time": entry}
+            if entry["time"] >= min_ingest_time:
+                ingested_alerts[alert_id] = entry
+
+        if len(ingested_alerts) > self._ingested_alerts_max_count:
+            newest_alerts = sorted(ingested_alerts.items(), key=lambda item: item[1]["time"])[-self._ingested_alerts_max_count :]
+            ingested_alerts = dict(newest_alerts)
+
+        self._state[self.STATE_INGESTED_ALERTS] = ingested_alerts
+
+    def _get_alert_ids(self, start_time, end_time, action_result):
         try:
-            # start time is considered as last 10 days
-            start_time = param["end_time"] - (432000000 * 2)
             params = {
                 "foundDateFrom": start_time,
-                "foundDateTo": param["end_time"],
+                "foundDateTo": end_time,
+                **self._alert_filters,
             }
-            response = self._session.get(self.INTSIGHTS_GET_ALERTS_LIST_URL, params=params)
+            response = self._make_rest_call("get", self.INTSIGHTS_GET_ALERTS_LIST_URL, "alerts-list", params=params)
             if response.status_code == 204:
                 return action_result.set_status(phantom.APP_SUCCESS), []
 
@@ -340,49 +1042,489 @@ class IntSightsConnector(BaseConnector):
 
         return phantom.APP_SUCCESS, alert_ids
 
-    def _on_poll(self, param):
-        action_result = self.add_action_result(phantom.ActionResult(dict(param)))
+    def _get_alert_fields(self, alert):
+        """
+        Copy the fields of a complete alert that are used to build its container and artifact.
 
-        ret_val, alert_ids = self._get_alert_ids(param, action_result)
-        if phantom.is_fail(ret_val):
-            return action_result.get_status()
+        Unexpected types are tolerated, a field that is not a dictionary or a list is read as empty.
+
+        :param alert: complete alert dictionary
+        :return: alert dictionary with the same layout, restricted to the used fields
+        """
+
+        def get_dict(value, key):
+            item = value.get(key)
+            return item if isinstance(item, dict) else {}
+
+        def get_dicts(value, key):
+            items = value.get(key)
+            return [item for item in items if isinstance(item, dict)] if isinstance(items, list) else []
+
+        details = get_dict(alert, "Details")
+        source = get_dict(details, "Source")
+
+        return {
+            "_id": alert.get("_id"),
+            "FoundDate": alert.get("FoundDate"),
+            "IsClosed": alert.get("IsClosed"),
+            "Assets": [{"Type": asset.get("Type"), "Value": asset.get("Value")} for asset in get_dicts(alert, "Assets")],
+            "Details": {
+                "Title": details.get("Title"),
+                "Description": details.get("Description"),
+                "Type": details.get("Type"),
+                "SubType": details.get("SubType"),
+                "Severity": details.get("Severity"),
+                "Tags": [{"Name": tag.get("Name")} for tag in get_dicts(details, "Tags")],
+                "Source": {"Date": source.get("Date", "")},
+            },
+        }
+
+    def _get_alert_hash(self, alert_fields):
+        """
+        Get a compact hash of the ingested fields of an alert, to detect changes without keeping the alert.
+
+        :param alert_fields: alert fields returned by _get_alert_fields
+        :return: hexadecimal hash
+        """
+        content = json.dumps(alert_fields, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha1(content.encode(), usedforsecurity=False).hexdigest()[:16]
 
-        max_results = param.get("container_count", len(alert_ids))
+    def _get_complete_alert(self, alert_id):
+        """
+        Fetch a complete alert. Runs inside the on_poll worker pool, so errors are returned instead of raised.
+
+        The parsed alert is reduced to the fields used by the container and artifact before it leaves
+        the worker. The whole alert is only kept as artifact data when its payload fits in
+        'artifact_data_max_bytes', larger payloads are kept as truncated raw text.
+
+        :param alert_id: IntSights alert ID
+        :return: alert ID, alert fields or None in case of failure, artifact data, error message or None
+        """
+        try:
+            response = self._make_rest_call("get", self.INTSIGHTS_GET_COMPLETE_ALERT_URL.format(alert_id=alert_id), "get-complete-alert")
+            response.raise_for_status()
+            # Parsing the raw bytes avoids keeping a decoded text copy of large payloads
+            content = response.content
+            with self._metrics.timer("parse_json"):
+                alert = json.loads(content)
+        except Exception as e:
+            return alert_id, None, None, unquote(self._get_error_message_from_exception(e))
+
+        if not isinstance(alert, dict):
+            return alert_id, None, None, self.INTSIGHTS_ERROR_NO_CONTENT
+
+        try:
+            alert_fields = self._get_alert_fields(alert)
+        except Exception as e:
+            return alert_id, None, None, self._get_error_message_from_exception(e)
+
+        if not self._artifact_data_max_bytes:
+            alert_data = alert_fields
+        elif len(content) <= self._artifact_data_max_bytes:
+            alert_data = alert
+        else:
+            alert_data = {
+                "truncated": True,
+                "size": len(content),
+                "raw": content[: self._artifact_data_max_bytes].decode("utf-8", errors="ignore"),
+            }
+
+        return alert_id, alert_fields, alert_data, None
+
+    def _get_container(self, alert_id, alert, alert_data=None):
+        artifact = self._get_artifact(alert, alert_data)
+        container = {
+            "name": "{title} - {id}".format(title=alert.get("Details", {}).get("Title"), id=alert_id),
+            "description": "Unresolved IntSights Alert",
+            "severity": alert.get("Details", {}).get("Severity"),
+            "source_data_identifier": alert_id,
+            "artifacts": [artifact],
+        }
+
+        return container
+
+    def _save_container_batch(self, alert_ids, containers):
+        """
+        Save a chunk of containers, with their artifacts embedded, in a single call.
+
+        If the chunk cannot be saved as a whole, its containers are saved one by one so that a bad
+        alert only fails itself.
+
+        :param alert_ids: IntSights alert IDs, in the same order as the containers
+        :param containers: list of containers to save
+        :return: dictionary of the ingested alert IDs to their container IDs, number of failed alerts
+        """
+        try:
+            with self._metrics.timer("save_containers"):
+                status, message, responses = self.save_containers(containers)
+        except Exception as e:
+            status, message, responses = phantom.APP_ERROR, self._get_error_message_from_exception(e), None
+
+        if phantom.is_fail(status) or not isinstance(responses, list) or len(responses) != len(containers):
+            self.debug_print(f"Failed to save a batch of {len(containers)} containers, saving them one by one. {message}")
+            responses = []
+            for container in containers:
+                try:
+                    with self._metrics.timer("save_container"):
+                        status, message, container_id = self.save_container(container)
+                except Exception as e:
+                    status, message, container_id = phantom.APP_ERROR, self._get_error_message_from_exception(e), None
+                responses.append({"success": phantom.is_success(status), "id": container_id, "message": message})
+
+        ingested_alert_ids = {}
+        for alert_id, container, response in zip(alert_ids, containers, responses):
+            if not response.get("success"):
+                self.save_progress(f"{self.PHANTOM_ERROR_SAVE_CONTAINER.format(alert_id=alert_id)}. {response.get('message')}")
+                self.debug_print("Failed to save container", dump_object=container)
+                continue
+
+            ingested_alert_ids[alert_id] = response.get("id")
+
+        return ingested_alert_ids, len(containers) - len(ingested_alert_ids)
+
+    def _iter_complete_alerts(self, executor, alert_ids, get_window, counters):
+        """
+        Download complete alerts concurrently and yield them in listing order.
 
-        if max_results < len(alert_ids):
-            alert_ids = alert_ids[:max_results]
+        At most 'get_window()' downloads are in flight, so memory stays flat whatever the number of
+        listed alerts, and alerts are not downloaded before the pipeline needs them.
 
+        :param executor: worker pool running the downloads
+        :param alert_ids: iterator of IntSights alert IDs
+        :param get_window: callable returning the current maximum number of downloads in flight
+        :param counters: dictionary whose 'downloads' counter is incremented for every submitted download
+        :return: generator of _get_complete_alert results
+        """
+        in_flight = deque()
         try:
             for alert_id in alert_ids:
-                alert = self._session.get(self.INTSIGHTS_GET_COMPLETE_ALERT_URL.format(alert_id=alert_id)).json()
-                artifact = self._get_artifact(alert)
-                container = {
-                    "name": "{title} - {id}".format(title=alert.get("Details", {}).get("Title"), id=alert_id),
-                    "description": "Unresolved IntSights Alert",
-                    "severity": alert.get("Details", {}).get("Severity"),
-                    "source_data_identifier": alert_id,
-                }
+                in_flight.append(executor.submit(self._get_complete_alert, alert_id))
+                counters["downloads"] += 1
+                while in_flight and len(in_flight) >= get_window():
+                    yield in_flight.popleft().result()
+
+            while in_flight:
+                yield in_flight.popleft().result()
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+    def _ingest_alerts(self, alert_ids, max_containers):
+        """
+        Ingest alerts through a streaming pipeline: filter, download, transform and save.
+
+        Alerts that were already ingested are filtered out before being downloaded, downloads run on
+        the worker pool with a bounded number in flight, and containers are saved as soon as a batch
+        is full or has waited for 'INTSIGHTS_CONTAINER_BATCH_MAX_WAIT_SECONDS'. The pipeline stops as
+        soon as 'max_containers' containers are saved, so skipped and failed alerts do not count.
+
+        Failures are counted per alert in the state, and an alert that failed 'alert_max_attempts' times
+        is given up on so that it does not hold the poll checkpoint back.
+
+        :param alert_ids: iterable of IntSights alert IDs, in listing order
+        :param max_containers: maximum number of containers to save or None for no limit
+        :return: dictionary with the ingested, failed, abandoned and skipped alert counts,
+            whether every alert was ingested or given up on
+        """
+        ingested_alerts_index = self._state[self.STATE_INGESTED_ALERTS]
+        failed_alerts_index = self._state[self.STATE_FAILED_ALERTS]
+        counters = {"ingested_alerts": 0, "failed_alerts": 0, "abandoned_alerts": 0, "skipped_alerts": 0}
+        # Kept apart from the counters returned in the summary
+        download_counters = {"downloads": 0}
+        batch_alert_ids = []
+        batch_containers = []
+        batch_hashes = []
+        batch_start_time = None
+
+        def iter_new_alert_ids():
+            for alert_id in alert_ids:
+                if alert_id in ingested_alerts_index:
+                    counters["skipped_alerts"] += 1
+                    continue
+                yield alert_id
+
+        def get_remaining_containers():
+            if max_containers is None:
+                return None
+            return max_containers - counters["ingested_alerts"] - len(batch_containers)
+
+        def get_window():
+            remaining_containers = get_remaining_containers()
+            window = 2 * self._max_workers
+            return window if remaining_containers is None else min(window, remaining_containers)
+
+        def record_failure(alert_id):
+            failure = failed_alerts_index.setdefault(alert_id, {"attempts": 0})
+            failure["attempts"] += 1
+            failure["time"] = int(time.time())
+            counters["failed_alerts"] += 1
+            if failure["attempts"] >= self._alert_max_attempts:
+                counters["abandoned_alerts"] += 1
+                self.debug_print(f"Giving up on alert {alert_id} after {failure['attempts']} failed attempts")
+
+        def save_batch():
+            batch_ingested_alert_ids, _ = self._save_container_batch(batch_alert_ids, batch_containers)
+            ingest_time = int(time.time())
+            for alert_id, alert_hash in zip(batch_alert_ids, batch_hashes):
+                if alert_id in batch_ingested_alert_ids:
+                    ingested_alerts_index[alert_id] = {
+                        "time": ingest_time,
+                        "hash": alert_hash,
+                        "container_id": batch_ingested_alert_ids[alert_id],
+                        "checked": ingest_time,
+                    }
+                    failed_alerts_index.pop(alert_id, None)
+                else:
+                    record_failure(alert_id)
+            counters["ingested_alerts"] += len(batch_ingested_alert_ids)
+            batch_alert_ids.clear()
+            batch_containers.clear()
+            batch_hashes.clear()
+
+        if max_containers is not None and max_containers <= 0:
+            return counters, False
+
+        new_alert_ids = iter_new_alert_ids()
+        processed_downloads = 0
+
+        with self._get_thread_pool(self._max_workers) as executor:
+            complete_alerts = self._iter_complete_alerts(executor, new_alert_ids, get_window, download_counters)
+            try:
+                for alert_id, alert, alert_data, error_message in complete_alerts:
+                    processed_downloads += 1
+                    if alert is None:
+                        record_failure(alert_id)
+                        self.save_progress(self.INTSIGHTS_ERROR_GET_ALERT.format(alert_id=alert_id, error=error_message))
+                    else:
+                        try:
+                            container = self._get_container(alert_id, alert, alert_data)
+                            batch_alert_ids.append(alert_id)
+                            batch_containers.append(container)
+                            batch_hashes.append(self._get_alert_hash(alert))
+                            batch_start_time = batch_start_time or time.monotonic()
+                        except Exception as e:
+                            record_failure(alert_id)
+                            error_message = self._get_error_message_from_exception(e)
+                            self.save_progress(f"{self.PHANTOM_ERROR_SAVE_CONTAINER.format(alert_id=alert_id)}. {error_message}")
+
+                    if batch_containers and (
+                        len(batch_containers) >= self._container_batch_size
+                        or get_remaining_containers() == 0
+                        or time.monotonic() - batch_start_time >= self.INTSIGHTS_CONTAINER_BATCH_MAX_WAIT_SECONDS
+                    ):
+                        save_batch()
+                        batch_start_time = None
+
+                    if get_remaining_containers() == 0:
+                        break
+            finally:
+                complete_alerts.close()
+
+        if batch_containers:
+            save_batch()
+
+        # Every listed alert was processed when no download was left behind and no alert ID is left,
+        # and the alerts that failed are only left behind once given up on
+        is_complete = (
+            processed_downloads == download_counters["downloads"]
+            and next(new_alert_ids, None) is None
+            and counters["failed_alerts"] == counters["abandoned_alerts"]
+        )
+
+        return counters, is_complete
+
+    def _revisit_alerts(self, checked_before):
+        """
+        Download the ingested alerts that were checked the longest time ago and add an artifact to the containers of the changed ones.
+
+        IntSights does not list updated alerts, so at most 'revisit_alerts_max_count' alerts are revisited
+        per poll. A change is detected by comparing the hash of the ingested fields (severity, assets,
+        closure...) with the one stored in the ingested alerts index, nothing is saved for unchanged alerts.
+
+        :param checked_before: epoch time (seconds), alerts ingested or revisited since are not revisited
+        :return: dictionary with the revisited and updated alert counts
+        """
+        counters = {"revisited_alerts": 0, "updated_alerts": 0}
+        ingested_alerts_index = self._state[self.STATE_INGESTED_ALERTS]
+        revisited_alerts = [
+            (alert_id, entry)
+            for alert_id, entry in ingested_alerts_index.items()
+            if entry.get("container_id") and entry.get("checked", 0) < checked_before
+        ]
+        revisited_alerts.sort(key=lambda item: item[1].get("checked", 0))
+        revisited_alerts = dict(revisited_alerts[: self._revisit_alerts_max_count])
+        if not revisited_alerts:
+            return counters
+
+        artifacts = []
+        updated_entries = []
+        check_time = int(time.time())
+        with self._get_thread_pool(min(self._max_workers, len(revisited_alerts))) as executor:
+            for alert_id, alert, alert_data, error_message in executor.map(self._get_complete_alert, revisited_alerts):
+                if alert is None:
+                    self.debug_print(self.INTSIGHTS_ERROR_GET_ALERT.format(alert_id=alert_id, error=error_message))
+                    continue
+
+                counters["revisited_alerts"] += 1
+                entry = revisited_alerts[alert_id]
+                entry["checked"] = check_time
+                alert_hash = self._get_alert_hash(alert)
+                if alert_hash == entry.get("hash"):
+                    continue
+
+                artifact = self._get_artifact(alert, alert_data)
+                artifact["label"] = "IntSights Alert Update"
+                artifact["container_id"] = entry["container_id"]
+                artifact["source_data_identifier"] = f"{alert_id}-{alert_hash}"
+                artifacts.append(artifact)
+                updated_entries.append((entry, alert_hash))
+
+        if artifacts:
+            with self._metrics.timer("save_artifacts"):
+                status, message, _ = self.save_artifacts(artifacts)
+            if phantom.is_fail(status):
+                # The previous hashes are kept so that the changes are detected again on the next revisit
+                self.debug_print(f"Failed to save the artifacts of the updated alerts. {message}")
+                return counters
+
+        for entry, alert_hash in updated_entries:
+            entry["hash"] = alert_hash
+        counters["updated_alerts"] = len(updated_entries)
+
+        return counters
+
+    def _get_backfill(self, end_time):
+        """
+        Get the progress of the backfill configured on the asset, starting a new one when the configured range changed.
+
+        :param end_time: end of the current poll, used as the end of the backfill when 'backfill_end' is not set
+        :return: backfill progress dictionary stored in the state or None when no backfill is configured
+        """
+        if not self._backfill_start:
+            self._state.pop(self.STATE_BACKFILL, None)
+            return None
+
+        backfill_range = f"{self._backfill_start}-{self._backfill_end}"
+        backfill = self._state.get(self.STATE_BACKFILL)
+        if not isinstance(backfill, dict) or backfill.get("range") != backfill_range:
+            backfill = {
+                "range": backfill_range,
+                "end": self._backfill_end or end_time,
+                "cursor": self._backfill_start,
+                "window": min(
+                    self._backfill_window_hours * self.INTSIGHTS_HOUR_IN_MILLISECONDS, self.INTSIGHTS_BACKFILL_MAX_WINDOW_MILLISECONDS
+                ),
+            }
+            self._state[self.STATE_BACKFILL] = backfill
+
+        return backfill
+
+    def _backfill_alerts(self, backfill, max_containers, action_result):
+        """
+        Ingest the alerts of the backfill range, walking time windows oldest first.
 
-                status, msg, container_id_ = self.save_container(container)
+        The cursor only moves past a window once all its alerts are ingested or given up on after
+        'alert_max_attempts' failures, so an interrupted backfill resumes where it stopped on the next poll. A window listing more than 'backfill_max_alerts_per_window'
+        alerts is split in half before anything is downloaded, and the window grows again once windows get sparse.
 
-                if phantom.is_fail(status):
-                    self.save_progress(self.PHANTOM_ERROR_SAVE_CONTAINER.format(alert_id=alert_id))
-                    self.debug_print("Failed to save container", dump_object=container)
-                    return action_result.set_status(phantom.APP_ERROR, self.PHANTOM_ERROR_SAVE_CONTAINER.format(alert_id=alert_id))
+        :param backfill: backfill progress dictionary, updated in place
+        :param max_containers: maximum number of containers to save or None for no limit
+        :param action_result: action result of the poll
+        :return: dictionary with the ingested, failed, abandoned and skipped alert counts
+        """
+        totals = {"ingested_alerts": 0, "failed_alerts": 0, "abandoned_alerts": 0, "skipped_alerts": 0}
+
+        while backfill["cursor"] < backfill["end"]:
+            remaining_containers = None if max_containers is None else max_containers - totals["ingested_alerts"]
+            if remaining_containers is not None and remaining_containers <= 0:
+                break
+
+            window_end = min(backfill["cursor"] + backfill["window"], backfill["end"])
+            ret_val, alert_ids = self._get_alert_ids(backfill["cursor"], window_end, action_result)
+            if phantom.is_fail(ret_val):
+                self.debug_print(f"Backfill stopped at {backfill['cursor']}: {action_result.get_message()}")
+                break
+
+            if len(alert_ids) > self._backfill_max_alerts_per_window and backfill["window"] > self.INTSIGHTS_BACKFILL_MIN_WINDOW_MILLISECONDS:
+                backfill["window"] = max(backfill["window"] // 2, self.INTSIGHTS_BACKFILL_MIN_WINDOW_MILLISECONDS)
+                continue
+
+            counters, is_complete = self._ingest_alerts(alert_ids, remaining_containers)
+            for key, value in counters.items():
+                totals[key] += value
+
+            if not is_complete:
+                break
 
-                artifact["container_id"] = container_id_
-                status, message, _ = self.save_artifacts([artifact])
+            backfill["cursor"] = window_end
+            if len(alert_ids) < self._backfill_max_alerts_per_window // 4:
+                backfill["window"] = min(backfill["window"] * 2, self.INTSIGHTS_BACKFILL_MAX_WINDOW_MILLISECONDS)
 
-                if phantom.is_fail(status):
-                    self.save_progress(self.PHANTOM_ERROR_SAVE_ARTIFACT.format(alert_id=alert_id))
-                    self.debug_print("Failed to save artifact", dump_object=artifact)
-                    return action_result.set_status(phantom.APP_ERROR, self.PHANTOM_ERROR_SAVE_ARTIFACT.format(alert_id=alert_id))
+        return totals
 
-            return action_result.set_status(phantom.APP_SUCCESS)
+    def _on_poll(self, param):
+        action_result = self.add_action_result(phantom.ActionResult(dict(param)))
+
+        is_poll_now = self.is_poll_now()
+        poll_time = int(time.time())
+        end_time = param["end_time"]
+        start_time = self._get_poll_start_time(end_time)
+
+        ret_val, alert_ids = self._get_alert_ids(start_time, end_time, action_result)
+        if phantom.is_fail(ret_val):
+            return action_result.get_status()
+
+        self._prune_ingested_alerts()
+
+        try:
+            counters, is_complete = self._ingest_alerts(alert_ids, param.get("container_count"))
         except Exception as e:
             error_message = self._get_error_message_from_exception(e)
             return action_result.set_status(phantom.APP_ERROR, f"Failed to get data {error_message}")
 
+        if not is_poll_now:
+            self._update_poll_checkpoint(end_time, is_complete)
+
+            if self._revisit_alerts_max_count:
+                try:
+                    action_result.update_summary(self._revisit_alerts(poll_time))
+                except Exception as e:
+                    self.debug_print(f"Failed to revisit the ingested alerts. {self._get_error_message_from_exception(e)}")
+
+            backfill = self._get_backfill(end_time)
+            if backfill and backfill["cursor"] < backfill["end"]:
+                max_containers = param.get("container_count")
+                if max_containers is not None:
+                    max_containers -= counters["ingested_alerts"]
+
+                try:
+                    backfill_counters = self._backfill_alerts(backfill, max_containers, action_result)
+                except Exception as e:
+                    self.debug_print(f"Backfill failed. {self._get_error_message_from_exception(e)}")
+                    backfill_counters = {}
+
+                for key, value in backfill_counters.items():
+                    counters[key] += value
+                action_result.update_summary(
+                    {"backfill_cursor": backfill["cursor"], "backfill_completed": backfill["cursor"] >= backfill["end"]}
+                )
+
+        action_result.update_summary(counters)
+
+        if not is_poll_now:
+            # Enrichments submitted with 'submit_only' are harvested by the scheduled polls
+            try:
+                collected_enrichments, _ = self._collect_pending_enrichments()
+                action_result.update_summary({"collected_enrichments": len(collected_enrichments)})
+            except Exception as e:
+                self.debug_print(f"Failed to collect the pending enrichments. {self._get_error_message_from_exception(e)}")
+
+        # Alerts given up on are only reported in the summary, they do not fail the poll
+        if counters["failed_alerts"] > counters["abandoned_alerts"] and not counters["ingested_alerts"]:
+            return action_result.set_status(phantom.APP_ERROR, f"Failed to ingest {counters['failed_alerts']} alert(s)")
+
+        return action_result.set_status(phantom.APP_SUCCESS)
+
     def _get_closure_json(self, param, action_result):
         closure_json = dict()
 
@@ -408,6 +1550,70 @@ class IntSightsConnector(BaseConnector):
 
         return phantom.APP_SUCCESS, closure_json
 
+    def _patch_alert(self, alert_id, url, endpoint, error_message, **kwargs):
+        """
+        Update an alert.
+
+        :param alert_id: IntSights alert ID
+        :param url: URL format of the update, with an 'alert_id' field
+        :param endpoint: endpoint name used in the action metrics
+        :param error_message: error message format, with an 'alert_id' field
+        :param kwargs: keyword arguments of requests.Session.request
+        :return: status phantom.APP_ERROR/phantom.APP_SUCCESS, error message or None
+        """
+        try:
+            response = self._make_rest_call("patch", url.format(alert_id=alert_id), endpoint, **kwargs)
+            if response.status_code in [400, 403, 500]:
+                return phantom.APP_ERROR, error_message.format(alert_id=alert_id)
+            response.raise_for_status()
+        except Exception as e:
+            self.error_print("Something went wrong")
+            exception_message = unquote(self._get_error_message_from_exception(e))
+            return phantom.APP_ERROR, f"{error_message.format(alert_id=alert_id)}. {exception_message}"
+
+        return phantom.APP_SUCCESS, None
+
+    def _patch_alerts(self, action_result, alert_ids, success_message, *args, **kwargs):
+        """
+        Update alerts concurrently, adding the outcome of every alert to the action result.
+
+        Requests share the rate limiter and retries of _make_rest_call.
+
+        :param action_result: action result of the bulk action
+        :param alert_ids: list of IntSights alert IDs
+        :param success_message: message of the updated alerts
+        :param args: url, endpoint and error message arguments of _patch_alert
+        :param kwargs: keyword arguments of requests.Session.request
+        :return: status phantom.APP_ERROR/phantom.APP_SUCCESS
+        """
+
+        def patch_alert(alert_id):
+            return alert_id, *self._patch_alert(alert_id, *args, **kwargs)
+
+        summary = {"total_alerts": len(alert_ids), "successful_alerts": 0, "failed_alerts": 0}
+
+        with self._get_thread_pool(min(self._max_workers, len(alert_ids))) as executor:
+            for alert_id, ret_val, message in executor.map(patch_alert, alert_ids):
+                if phantom.is_fail(ret_val):
+                    summary["failed_alerts"] += 1
+                else:
+                    summary["successful_alerts"] += 1
+
+                action_result.add_data(
+                    {
+                        "alert_id": alert_id,
+                        "status": "success" if phantom.is_success(ret_val) else "failed",
+                        "message": message or success_message,
+                    }
+                )
+
+        action_result.update_summary(summary)
+
+        if summary["failed_alerts"] == len(alert_ids):
+            return action_result.set_status(phantom.APP_ERROR, f"Failed to update {len(alert_ids)} alert(s)")
+
+        return action_result.set_status(phantom.APP_SUCCESS, f"Updated {summary['successful_alerts']} of {len(alert_ids)} alert(s)")
+
     def _close_alert(self, param):
         self.debug_print("Starting close alert")
 
@@ -417,84 +1623,357 @@ class IntSightsConnector(BaseConnector):
         if phantom.is_fail(ret_val):
             return action_result.get_status()
 
-        try:
-            response = self._session.patch(self.INTSIGHTS_CLOSE_ALERT_URL.format(alert_id=alert_id), json=closure_json)
-            if response.status_code in [400, 403, 500]:
-                return action_result.set_status(phantom.APP_ERROR, self.INTSIGHTS_ERROR_CLOSE_ALERT.format(alert_id=alert_id))
-            response.raise_for_status()
-            return action_result.set_status(phantom.APP_SUCCESS, "Successfully closed the alert")
-        except Exception as e:
-            self.error_print("Something went wrong")
-            error_message = unquote(self._get_error_message_from_exception(e))
-            message = f"{self.INTSIGHTS_ERROR_TAKEDOWN_ALERT.format(alert_id=alert_id)}. {error_message}"
+        ret_val, message = self._patch_alert(
+            alert_id, self.INTSIGHTS_CLOSE_ALERT_URL, "close-alert", self.INTSIGHTS_ERROR_CLOSE_ALERT, json=closure_json
+        )
+        if phantom.is_fail(ret_val):
             return action_result.set_status(phantom.APP_ERROR, message)
 
+        return action_result.set_status(phantom.APP_SUCCESS, "Successfully closed the alert")
+
+    def _bulk_close_alerts(self, param):
+        self.debug_print("Starting bulk close alerts")
+
+        action_result = self.add_action_result(phantom.ActionResult(dict(param)))
+        alert_ids = self._get_list_from_string(param["alert_ids"])
+        if not alert_ids:
+            return action_result.set_status(phantom.APP_ERROR, self.INTSIGHTS_ERROR_NO_ALERT_IDS.format(param="alert_ids"))
+
+        ret_val, closure_json = self._get_closure_json(param, action_result)
+        if phantom.is_fail(ret_val):
+            return action_result.get_status()
+
+        return self._patch_alerts(
+            action_result,
+            alert_ids,
+            "Successfully closed the alert",
+            self.INTSIGHTS_CLOSE_ALERT_URL,
+            "close-alert",
+            self.INTSIGHTS_ERROR_CLOSE_ALERT,
+            json=closure_json,
+        )
+
     def _takedown_request(self, param):
         self.debug_print("Starting takedown request")
         action_result = self.add_action_result(phantom.ActionResult(dict(param)))
         alert_id = param["alert_id"]
 
+        ret_val, message = self._patch_alert(
+            alert_id, self.INTSIGHTS_ALERT_TAKEDOWN_URL, "takedown-request", self.INTSIGHTS_ERROR_TAKEDOWN_ALERT
+        )
+        if phantom.is_fail(ret_val):
+            return action_result.set_status(phantom.APP_ERROR, message)
+
+        return action_result.set_status(phantom.APP_SUCCESS, "Takedown request successfully executed")
+
+    def _bulk_takedown_request(self, param):
+        self.debug_print("Starting bulk takedown request")
+        action_result = self.add_action_result(phantom.ActionResult(dict(param)))
+        alert_ids = self._get_list_from_string(param["alert_ids"])
+        if not alert_ids:
+            return action_result.set_status(phantom.APP_ERROR, self.INTSIGHTS_ERROR_NO_ALERT_IDS.format(param="alert_ids"))
+
+        return self._patch_alerts(
+            action_result,
+            alert_ids,
+            "Takedown request successfully executed",
+            self.INTSIGHTS_ALERT_TAKEDOWN_URL,
+            "takedown-request",
+            self.INTSIGHTS_ERROR_TAKEDOWN_ALERT,
+        )
+
+    def _get_enrichment(self, ioc):
+        """
+        Poll the enrichment API once for an IOC.
+
+        :param ioc: IOC to enrich
+        :return: IOC, status phantom.APP_ERROR/phantom.APP_SUCCESS/None while the enrichment is in progress, message, IOC data
+        """
         try:
-            response = self._session.patch(self.INTSIGHTS_ALERT_TAKEDOWN_URL.format(alert_id=alert_id))
-            if response.status_code in [400, 403, 500]:
-                return action_result.set_status(phantom.APP_ERROR, self.INTSIGHTS_ERROR_TAKEDOWN_ALERT.format(alert_id=alert_id))
+            response = self._make_rest_call("get", f"{self.INTSIGHTS_ENRICH_IOC_URL}/{ioc}", "enrich")
+            if response.status_code == 204:
+                return ioc, phantom.APP_SUCCESS, self.INTSIGHTS_ERROR_NO_CONTENT, None
             response.raise_for_status()
-            return action_result.set_status(phantom.APP_SUCCESS, "Takedown request successfully executed")
         except Exception as e:
-            self.error_print("Something went wrong")
             error_message = unquote(self._get_error_message_from_exception(e))
-            message = f"{self.INTSIGHTS_ERROR_TAKEDOWN_ALERT.format(alert_id=alert_id)}. {error_message}"
+            return ioc, phantom.APP_ERROR, self.INTSIGHTS_ERROR_CONNECTION.format(error=error_message), None
+
+        try:
+            ioc_data = response.json()
+        except Exception as e:
+            error_message = self._get_error_message_from_exception(e)
+            message = f"{self.INTSIGHTS_ERROR_UNABLE_TO_PARSE_JSON_RESPONSE.format(error=error_message)} response was: {response.text}"
+            return ioc, phantom.APP_ERROR, message, None
+
+        ioc_data["InvestigationLink"] = self.INTSIGHTS_INVESTIGATION_LINK_URL.format(ioc=ioc)
+
+        status = ioc_data.get("Status")
+
+        if status == "QuotaExceeded":
+            return ioc, phantom.APP_ERROR, self.INTSIGHTS_ERROR_QUOTA_EXCEEDED, None
+
+        elif status == "Failed":
+            return ioc, phantom.APP_ERROR, self.INTSIGHTS_ERROR_ENRICHMENT_FAILED.format(reason=ioc_data.get("FailedReason")), None
+
+        elif status == "Done":
+            return ioc, phantom.APP_SUCCESS, "Enrichment completed", ioc_data
+
+        return ioc, None, self.INTSIGHTS_ERROR_ENRICHMENT_TIMEOUT_MESSAGE, ioc_data
+
+    def _merge_pending_enrichments(self, latest_state):
+        """
+        Apply the enrichments submitted and collected by this run to the pending enrichments of the latest saved state.
+
+        Pending enrichments are shared by concurrent action runs, so they are merged with the state
+        file as it is now instead of being overwritten with the copy loaded in initialize.
+
+        :param latest_state: state as it is saved now
+        :return: dictionary of the pending enrichments
+        """
+        pending_enrichments = latest_state.get(self.STATE_PENDING_ENRICHMENTS) if isinstance(latest_state, dict) else None
+        if not isinstance(pending_enrichments, dict):
+            pending_enrichments = {}
+
+        for ioc, enrichment in self._submitted_enrichments.items():
+            pending_enrichment = pending_enrichments.setdefault(ioc, enrichment)
+            for container_id in enrichment["container_ids"]:
+                if container_id not in pending_enrichment["container_ids"]:
+                    pending_enrichment["container_ids"].append(container_id)
+
+        for ioc in self._collected_enrichments:
+            pending_enrichments.pop(ioc, None)
+
+        return pending_enrichments
+
+    def _submit_enrichments(self, iocs, action_result):
+        """Start the enrichment of the IOCs and record the ones in progress so that they are collected later."""
+        with self._get_thread_pool(min(self._max_workers, len(iocs))) as executor:
+            enrichments = list(executor.map(self._get_enrichment, iocs))
+
+        container_id = self.get_container_id()
+        submitted_iocs = []
+        failures = []
+        for ioc, status, message, ioc_data in enrichments:
+            if status is None:
+                enrichment = self._submitted_enrichments.setdefault(ioc, {"submit_time": int(time.time()), "container_ids": []})
+                if container_id and container_id not in enrichment["container_ids"]:
+                    enrichment["container_ids"].append(container_id)
+                submitted_iocs.append(ioc)
+            elif phantom.is_fail(status):
+                failures.append(f"{ioc}: {message}")
+            elif ioc_data:
+                # The enrichment was already done, there is nothing to wait for
+                action_result.add_data(ioc_data)
+
+        action_result.update_summary(
+            {
+                "total_iocs": len(iocs),
+                "submitted_iocs": len(submitted_iocs),
+                "enriched_iocs": len(iocs) - len(submitted_iocs) - len(failures),
+                "failed_iocs": len(failures),
+            }
+        )
+
+        message = f"Enrichment submitted for {len(submitted_iocs)} of {len(iocs)} IOC(s)"
+        if failures:
+            message = f"{message}. Failed: {'; '.join(failures)}"
+
+        if len(failures) == len(iocs):
             return action_result.set_status(phantom.APP_ERROR, message)
 
+        return action_result.set_status(phantom.APP_SUCCESS, message)
+
+    def _get_enrichment_artifact(self, ioc, ioc_data, container_id):
+        enrichment_data = ioc_data.get("Data") or {}
+        cef = {
+            "IOC": ioc,
+            "Type": enrichment_data.get("Type"),
+            "Severity": enrichment_data.get("Severity"),
+            "InvestigationLink": ioc_data.get("InvestigationLink"),
+        }
+
+        artifact = {
+            "label": "IntSights Enrichment",
+            "name": f"IntSights Enrichment - {ioc}",
+            "container_id": container_id,
+            "source_data_identifier": f"{ioc}_enrichment",
+            "data": ioc_data,
+            "cef": {key: value for key, value in cef.items() if value},
+        }
+
+        return artifact
+
+    def _collect_pending_enrichments(self):
+        """
+        Poll every pending enrichment once and attach the finished ones as artifacts to the containers they were submitted from.
+
+        :return: list of dictionaries describing the enrichments that are no longer pending, number of enrichments still pending
+        """
+        pending_enrichments = dict(self._state.get(self.STATE_PENDING_ENRICHMENTS) or {})
+        pending_enrichments.update(self._submitted_enrichments)
+        pending_enrichments = {ioc: enrichment for ioc, enrichment in pending_enrichments.items() if ioc not in self._collected_enrichments}
+        if not pending_enrichments:
+            return [], 0
+
+        with self._get_thread_pool(min(self._max_workers, len(pending_enrichments))) as executor:
+            enrichments = list(executor.map(self._get_enrichment, pending_enrichments))
+
+        collected_enrichments = []
+        for ioc, status, message, ioc_data in enrichments:
+            pending_enrichment = pending_enrichments[ioc]
+            if status is None:
+                if time.time() - pending_enrichment["submit_time"] < self.INTSIGHTS_PENDING_ENRICHMENT_MAX_AGE_SECONDS:
+                    continue
+                status, message, ioc_data = "Expired", self.INTSIGHTS_ERROR_ENRICHMENT_TIMEOUT_MESSAGE, None
+            elif phantom.is_fail(status):
+                status = "Failed"
+            else:
+                status = "Done"
+
+            self._collected_enrichments.add(ioc)
+
+            if ioc_data:
+                artifacts = [self._get_enrichment_artifact(ioc, ioc_data, container_id) for container_id in pending_enrichment["container_ids"]]
+                if artifacts:
+                    ret_val, artifact_message, _ = self.save_artifacts(artifacts)
+                    if phantom.is_fail(ret_val):
+                        self.debug_print(f"Failed to save the enrichment artifacts of IOC {ioc}. {artifact_message}")
+
+            collected_enrichments.append(
+                {
+                    "ioc": ioc,
+                    "status": status,
+                    "message": message,
+                    "container_ids": pending_enrichment["container_ids"],
+                    "enrichment": ioc_data or {},
+                }
+            )
+
+        return collected_enrichments, len(pending_enrichments) - len(collected_enrichments)
+
+    def _collect_enrichments(self, param):
+        self.debug_print("Starting enrichments collection")
+        action_result = self.add_action_result(phantom.ActionResult(dict(param)))
+
+        collected_enrichments, pending_enrichments = self._collect_pending_enrichments()
+        for enrichment in collected_enrichments:
+            action_result.add_data(enrichment)
+
+        action_result.update_summary(
+            {
+                "collected_enrichments": sum(enrichment["status"] == "Done" for enrichment in collected_enrichments),
+                "failed_enrichments": sum(enrichment["status"] == "Failed" for enrichment in collected_enrichments),
+                "expired_enrichments": sum(enrichment["status"] == "Expired" for enrichment in collected_enrichments),
+                "pending_enrichments": pending_enrichments,
+            }
+        )
+
+        return action_result.set_status(
+            phantom.APP_SUCCESS, f"Collected {len(collected_enrichments)} enrichment(s), {pending_enrichments} still pending"
+        )
+
     def _enrich_ioc(self, param):
         self.debug_print("Starting IOC enrichment")
         action_result = self.add_action_result(phantom.ActionResult(dict(param)))
 
-        ioc = param["ioc"]
-        max_poll_cycles = param["max_poll_cycles"]
-        sleep_seconds = param["sleep_seconds"]
+        # 'ioc' is a single value, commas included (URLs), only 'iocs' is a list
+        ioc = self._normalize_ioc(str(param.get("ioc") or "").strip())
+        iocs = list(dict.fromkeys(([ioc] if ioc else []) + self._get_iocs_from_string(param.get("iocs") or [])))
+        if not iocs:
+            return action_result.set_status(phantom.APP_ERROR, self.INTSIGHTS_ERROR_NO_ENRICH_IOCS)
 
-        for x in range(max_poll_cycles):
-            try:
-                response = self._session.get(f"{self.INTSIGHTS_ENRICH_IOC_URL}/{ioc}")
-                if response.status_code == 204:
-                    return action_result.set_status(phantom.APP_SUCCESS, self.INTSIGHTS_ERROR_NO_CONTENT)
-                response.raise_for_status()
-            except requests.HTTPError as e:
-                error_message = unquote(self._get_error_message_from_exception(e))
-                return action_result.set_status(phantom.APP_ERROR, self.INTSIGHTS_ERROR_CONNECTION.format(error=error_message))
+        ret_val, max_poll_cycles = self._validate_integer(action_result, param["max_poll_cycles"], "max_poll_cycles")
+        if phantom.is_fail(ret_val):
+            return action_result.get_status()
 
-            try:
-                ioc_data = response.json()
-            except Exception as e:
-                error_message = self._get_error_message_from_exception(e)
-                return action_result.set_status(
-                    phantom.APP_ERROR,
-                    f"{self.INTSIGHTS_ERROR_UNABLE_TO_PARSE_JSON_RESPONSE.format(error=error_message)} response was: {response.text}",
-                )
+        ret_val, sleep_seconds = self._validate_number(action_result, param["sleep_seconds"], "sleep_seconds")
+        if phantom.is_fail(ret_val):
+            return action_result.get_status()
 
-            ioc_data["InvestigationLink"] = self.INTSIGHTS_INVESTIGATION_LINK_URL.format(ioc=ioc)
+        ret_val, max_sleep_seconds = self._validate_number(
+            action_result, param.get("max_sleep_seconds", self.INTSIGHTS_DEFAULT_ENRICHMENT_MAX_SLEEP_SECONDS), "max_sleep_seconds"
+        )
+        if phantom.is_fail(ret_val):
+            return action_result.get_status()
+
+        if param.get("submit_only", False):
+            return self._submit_enrichments(iocs, action_result)
+
+        # IOC -> (status, message, IOC data), the status stays None while the enrichment is in progress
+        enrichments = {ioc: (None, self.INTSIGHTS_ERROR_ENRICHMENT_TIMEOUT_MESSAGE, None) for ioc in iocs}
+        pending_iocs = iocs
+
+        # All pending IOCs are polled in every cycle, and the wait between cycles grows
+        # exponentially so that slow enrichments do not burn the API quota. The total wait
+        # stays within the one of fixed 'sleep_seconds' waits between 'max_poll_cycles' cycles.
+        wait_budget = max_poll_cycles * sleep_seconds
+        with self._get_thread_pool(min(self._max_workers, len(iocs))) as executor:
+            for poll_cycle in range(max_poll_cycles):
+                if poll_cycle:
+                    if sleep_seconds and wait_budget <= 0:
+                        break
+                    wait_seconds = min(
+                        sleep_seconds * (self.INTSIGHTS_ENRICHMENT_BACKOFF_FACTOR ** (poll_cycle - 1)), max_sleep_seconds, wait_budget
+                    )
+                    time.sleep(wait_seconds)
+                    wait_budget -= wait_seconds
+
+                for ioc, status, message, ioc_data in executor.map(self._get_enrichment, pending_iocs):
+                    enrichments[ioc] = (status, message, ioc_data)
+                    if status == phantom.APP_ERROR and message == self.INTSIGHTS_ERROR_QUOTA_EXCEEDED:
+                        # The quota applies to the whole account, polling the other IOCs would fail as well
+                        for pending_ioc in pending_iocs:
+                            if enrichments[pending_ioc][0] is None:
+                                enrichments[pending_ioc] = (status, message, None)
+
+                pending_iocs = [ioc for ioc in pending_iocs if enrichments[ioc][0] is None]
+                if not pending_iocs:
+                    break
+
+        if pending_iocs:
+            self.debug_print(f"{self.INTSIGHTS_ERROR_ENRICHMENT_TIMEOUT_MESSAGE}. Pending IOCs: {pending_iocs}")
+
+        for ioc in iocs:
+            status, message, ioc_data = enrichments[ioc]
+            if ioc_data:
+                action_result.add_data(ioc_data)
+
+        if len(iocs) == 1:
+            status, message, _ = enrichments[iocs[0]]
+            return action_result.set_status(phantom.APP_SUCCESS if status is None else status, message)
 
-            status = ioc_data["Status"]
+        failed_iocs = [ioc for ioc in iocs if enrichments[ioc][0] == phantom.APP_ERROR]
+        action_result.update_summary(
+            {
+                "total_iocs": len(iocs),
+                "enriched_iocs": len(iocs) - len(failed_iocs) - len(pending_iocs),
+                "pending_iocs": len(pending_iocs),
+                "failed_iocs": len(failed_iocs),
+            }
+        )
 
-            if status == "QuotaExceeded":
-                return action_result.set_status(phantom.APP_ERROR, self.INTSIGHTS_ERROR_QUOTA_EXCEEDED)
+        message = f"Enrichment completed for {len(iocs) - len(failed_iocs) - len(pending_iocs)} of {len(iocs)} IOC(s)"
+        if pending_iocs:
+            message = f"{message}. Timeout occured for: {', '.join(pending_iocs)}"
+        if failed_iocs:
+            failures = "; ".join(f"{ioc}: {enrichments[ioc][1]}" for ioc in failed_iocs)
+            message = f"{message}. Failed: {failures}"
 
-            elif status == "Failed":
-                message = self.INTSIGHTS_ERROR_ENRICHMENT_FAILED.format(reason=ioc_data["FailedReason"])
-                return action_result.set_status(phantom.APP_ERROR, message)
+        if len(failed_iocs) == len(iocs):
+            return action_result.set_status(phantom.APP_ERROR, message)
 
-            elif status == "Done":
-                action_result.add_data(ioc_data)
-                return action_result.set_status(phantom.APP_SUCCESS, "Enrichment completed")
+        return action_result.set_status(phantom.APP_SUCCESS, message)
 
-            else:
-                time.sleep(sleep_seconds)
+    def _report_metrics(self):
+        """Add the metrics of the action run to the summary of its first action result and to the debug log."""
+        metrics = self._metrics.get_summary()
+        if self._concurrency_limiter:
+            metrics["concurrency"] = self._concurrency_limiter.get_summary()
+        self.debug_print(f"IntSights action metrics: {json.dumps(metrics)}")
 
-        self.debug_print("Timeout occured on the enrichment API calls, see data for link to ongoing investigation enrichment")
-        action_result.add_data(ioc_data)
-        msg = "Timeout occured on the enrichment API calls, see data for link to ongoing investigation enrichment"
-        return action_result.set_status(phantom.APP_SUCCESS, msg)
+        action_results = self.get_action_results()
+        if action_results:
+            action_results[0].update_summary({"metrics": metrics})
 
     def handle_action(self, param):
         """Get current action identifier and call member function of its own to handle the action."""
@@ -522,14 +2001,22 @@ class IntSightsConnector(BaseConnector):
             ret_val = self._enrich_ioc(param)
         elif action_id == self.ACTION_ID_HUNT_IOC:
             ret_val = self._hunt_ioc(param)
+        elif action_id == self.ACTION_ID_HUNT_IOCS:
+            ret_val = self._hunt_iocs(param)
+        elif action_id == self.ACTION_ID_COLLECT_ENRICHMENTS:
+            ret_val = self._collect_enrichments(param)
+        elif action_id == self.ACTION_ID_BULK_CLOSE_ALERTS:
+            ret_val = self._bulk_close_alerts(param)
+        elif action_id == self.ACTION_ID_BULK_TAKEDOWN_REQUEST:
+            ret_val = self._bulk_takedown_request(param)
         else:
             raise ValueError(f"Action {action_id} is not supported")
 
+        self._report_metrics()
         return ret_val
 
 
 if __name__ == "__main__":
-    import json
     import sys
 
     if len(sys.argv) < 2:
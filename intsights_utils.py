@@ -0,0 +1,568 @@
+# File: intsights_utils.py
+#
+# Copyright (c) 2019-2025 IntSights Cyber Intelligence Ltd.
+#
+# This unpublished material is proprietary to IntSights.
+# All rights reserved. The methods and
+# techniques described herein are considered trade secrets
+# and/or confidential. Reproduction or distribution, in whole
+# or in part, is forbidden except by express written permission
+# of IntSights.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+import fcntl
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+
+
+class IocCache:
+    """
+    Represent a size-bounded cache of IOC lookups shared by concurrent action runs.
+
+    Found IOCs are kept for 'ttl' seconds, IOCs unknown to IntSights for 'negative_ttl' seconds.
+    Every lookup is a small JSON file of the cache directory, named after the hash of the IOC and
+    replaced atomically, so caching a lookup costs one file write and reads need no lock. The
+    modification time of a file is its last access time, and when the directory holds more than
+    'max_entries' lookups the least recently used ones are evicted by save().
+
+    The directory also holds the lock files of lock(), which are evicted with their lookups, and
+    nothing else is written to the state directory.
+    """
+
+    def __init__(self, path, ttl, negative_ttl, max_entries, lock_timeout=60):
+        """Initialize the cache, the directory is created on first write."""
+        self._path = path
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+        self._max_entries = max_entries
+        self._lock_timeout = lock_timeout
+        self._accessed = {}
+        self._lock = threading.Lock()
+
+    def _get_entry_path(self, key, extension=".json"):
+        return os.path.join(self._path, f"{hashlib.sha1(key.encode(), usedforsecurity=False).hexdigest()}{extension}")
+
+    @contextmanager
+    def _file_lock(self, path):
+        """Hold an exclusive lock on a lock file, giving up on it after 'lock_timeout' seconds or if it cannot be opened."""
+        try:
+            os.makedirs(self._path, exist_ok=True)
+            lock_file = open(path, "a")
+        except OSError:
+            yield False
+            return
+
+        with lock_file as f:
+            deadline = time.monotonic() + self._lock_timeout
+            while True:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        # A stuck holder must not block the action, the caller proceeds unlocked
+                        yield False
+                        return
+                    time.sleep(0.01)
+                except OSError:
+                    yield False
+                    return
+
+            try:
+                yield True
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def get(self, key):
+        """
+        Get a cached lookup.
+
+        :param key: IOC value
+        :return: whether the lookup is cached, IOC data or None when IntSights has no data for the IOC
+        """
+        try:
+            with open(self._get_entry_path(key)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return False, None
+
+        now = time.time()
+        if not isinstance(entry, dict) or entry.get("key") != key or entry.get("expires", 0) <= now:
+            return False, None
+
+        with self._lock:
+            self._accessed[key] = now
+        return True, entry.get("value")
+
+    def set(self, key, value):
+        """
+        Cache a lookup and write it right away, so that concurrent action runs can reuse it.
+
+        :param key: IOC value
+        :param value: IOC data or None when IntSights has no data for the IOC
+        :raises OSError: if the lookup cannot be written, no partial file is left behind
+        """
+        ttl = self._ttl if value is not None else self._negative_ttl
+        if ttl <= 0:
+            return
+
+        entry_path = self._get_entry_path(key)
+        temp_path = f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self._path, exist_ok=True)
+            with open(temp_path, "w") as f:
+                json.dump({"key": key, "expires": time.time() + ttl, "value": value}, f)
+            os.replace(temp_path, entry_path)
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+    @contextmanager
+    def lock(self, key):
+        """
+        Serialize the lookups of a key across threads and processes.
+
+        A lookup missing from the cache is made while holding the lock, so that concurrent lookups of
+        the same IOC wait for it and find its result in the cache instead of calling the API again.
+        Every key has its own lock file, so lookups of different IOCs never wait for each other.
+
+        :return: context manager yielding whether the lock is held, the caller proceeds unlocked otherwise
+        """
+        with self._file_lock(self._get_entry_path(key, ".lock")) as locked:
+            yield locked
+
+    def save(self):
+        """
+        Record the access times of the lookups served from the cache and evict the least recently used lookups.
+
+        Lock files are evicted with their lookup, or once older than 'lock_timeout' when the lookup was never cached.
+        """
+        with self._lock:
+            accessed = self._accessed
+            self._accessed = {}
+
+        for key, access_time in accessed.items():
+            try:
+                os.utime(self._get_entry_path(key), (access_time, access_time))
+            except OSError:
+                pass
+
+        entries = []
+        lock_files = {}
+        try:
+            with os.scandir(self._path) as it:
+                for entry in it:
+                    if entry.name.endswith(".json"):
+                        entries.append((entry.stat().st_mtime, entry.path))
+                    elif entry.name.endswith(".lock"):
+                        lock_files[entry.path[: -len(".lock")]] = entry.stat().st_mtime
+        except OSError:
+            # The directory does not exist yet or an entry was removed by a concurrent eviction
+            return
+
+        entries.sort()
+        evicted_count = max(len(entries) - self._max_entries, 0)
+        evicted_paths = [entry_path for _, entry_path in entries[:evicted_count]]
+        kept_paths = {entry_path[: -len(".json")] for _, entry_path in entries[evicted_count:]}
+        min_lock_time = time.time() - self._lock_timeout
+        evicted_paths.extend(f"{path}.lock" for path, lock_time in lock_files.items() if path not in kept_paths and lock_time < min_lock_time)
+        for path in evicted_paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class TokenBucket:
+    """
+    Represent a client-side rate limiter shared by all the threads of an action run.
+
+    Tokens are refilled at 'rate' per second up to 'capacity', and every request takes one token.
+    When 'path' is set, the bucket is kept in that file under an exclusive file lock, so that it is
+    shared by the concurrent action runs of the asset. If the file cannot be used, the bucket falls
+    back to the memory of the action run.
+    """
+
+    def __init__(self, rate, capacity=None, path=None):
+        """Initialize a full bucket."""
+        self._rate = rate
+        self._capacity = capacity or max(rate, 1)
+        self._path = path
+        self._tokens = self._capacity
+        self._updated = time.time()
+        self._lock = threading.Lock()
+
+    def _take(self, tokens, updated):
+        """
+        Refill the bucket and take a token if one is available.
+
+        :return: tokens left, update time, seconds to wait before a token is available or 0 if one was taken
+        """
+        now = time.time()
+        tokens = min(self._capacity, tokens + max(now - updated, 0) * self._rate)
+        if tokens >= 1:
+            return tokens - 1, now, 0
+
+        return tokens, now, (1 - tokens) / self._rate
+
+    def _take_shared(self):
+        with open(self._path, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                try:
+                    tokens, updated = (float(value) for value in json.loads(f.read()))
+                except (TypeError, ValueError):
+                    tokens, updated = self._capacity, time.time()
+
+                tokens, updated, wait_seconds = self._take(tokens, updated)
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps([tokens, updated]))
+                f.flush()
+                return wait_seconds
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def acquire(self):
+        """Take a token, waiting for the bucket to refill if it is empty."""
+        while True:
+            with self._lock:
+                wait_seconds = None
+                if self._path:
+                    try:
+                        wait_seconds = self._take_shared()
+                    except OSError:
+                        self._path = None
+
+                if wait_seconds is None:
+                    self._tokens, self._updated, wait_seconds = self._take(self._tokens, self._updated)
+
+            if not wait_seconds:
+                return
+
+            time.sleep(wait_seconds)
+
+
+class ConcurrencyLimiter:
+    """
+    Represent an adaptive limit on the number of requests in flight, shared by all the threads of an action run.
+
+    The limit follows AIMD: it grows by one after a full limit's worth of healthy requests while it is reached,
+    and is halved on an overload signal, a throttled or unavailable response, a timeout or a p95 latency over
+    'latency_tolerance' times its moving baseline. Requests started before a decrease do not decrease it again,
+    so that a burst of failures of the same window halves the limit once.
+    """
+
+    # Number of healthy latencies whose p95 is compared to the baseline
+    LATENCY_WINDOW = 20
+
+    def __init__(self, max_limit, initial_limit=None, min_limit=1, latency_tolerance=2):
+        """Initialize the limit, at half the maximum limit unless specified."""
+        self._max_limit = max_limit
+        self._min_limit = min(min_limit, max_limit)
+        self._limit = initial_limit or max(self._min_limit, (max_limit + 1) // 2)
+        self._latency_tolerance = latency_tolerance
+        self._in_flight = 0
+        self._epoch = 0
+        self._successes = 0
+        self._saturated = False
+        self._latencies = []
+        self._baseline_p95 = None
+        self._stats = {"initial_limit": self._limit, "lowest_limit": self._limit, "highest_limit": self._limit, "increases": 0, "decreases": 0}
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """
+        Wait for a free slot under the current limit.
+
+        :return: ticket to pass to release
+        """
+        with self._condition:
+            while self._in_flight >= self._limit:
+                self._condition.wait()
+            self._in_flight += 1
+            if self._in_flight >= self._limit:
+                self._saturated = True
+            return self._epoch
+
+    def release(self, ticket, seconds=None, overloaded=False):
+        """
+        Free the slot of a request and adjust the limit to its outcome.
+
+        :param ticket: ticket returned by acquire
+        :param seconds: latency of a healthy request, None if it failed
+        :param overloaded: whether the request was throttled, found the server unavailable or timed out
+        """
+        with self._condition:
+            self._in_flight -= 1
+            if overloaded:
+                self._decrease(ticket)
+            elif seconds is not None:
+                self._latencies.append(seconds)
+                if len(self._latencies) == self.LATENCY_WINDOW:
+                    self._check_latency(ticket)
+                self._successes += 1
+                if self._successes >= self._limit and self._saturated and self._limit < self._max_limit:
+                    self._set_limit(self._limit + 1, "increases")
+            self._condition.notify_all()
+
+    def _check_latency(self, ticket):
+        latencies = sorted(self._latencies)
+        self._latencies = []
+        p95 = latencies[int(0.95 * (len(latencies) - 1))]
+        if self._baseline_p95 is None:
+            self._baseline_p95 = p95
+            return
+
+        if p95 > self._latency_tolerance * self._baseline_p95:
+            self._decrease(ticket)
+        # The baseline follows lasting latency changes so that a slower API does not keep the limit at its minimum
+        self._baseline_p95 = 0.8 * self._baseline_p95 + 0.2 * p95
+
+    def _decrease(self, ticket):
+        if ticket != self._epoch:
+            return
+
+        self._epoch += 1
+        if self._limit > self._min_limit:
+            self._set_limit(max(self._min_limit, self._limit // 2), "decreases")
+
+    def _set_limit(self, limit, adjustment):
+        self._limit = limit
+        self._successes = 0
+        self._saturated = False
+        self._stats[adjustment] += 1
+        self._stats["lowest_limit"] = min(self._stats["lowest_limit"], limit)
+        self._stats["highest_limit"] = max(self._stats["highest_limit"], limit)
+
+    def get_summary(self):
+        """
+        Get the current limit and its adjustments so far.
+
+        :return: JSON serializable dictionary
+        """
+        with self._condition:
+            return {"limit": self._limit, "max_limit": self._max_limit, **self._stats}
+
+
+class ActionMetrics:
+    """
+    Represent the instrumentation of an action run, shared by all its threads.
+
+    Records per-endpoint call counts, latencies, bytes received, retries and errors,
+    the time spent in named phases (JSON parsing, container saving...) summed over threads and cache hits.
+    """
+
+    # Upper bounds, in milliseconds, of the latency histogram buckets
+    LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self):
+        """Initialize empty metrics, the run duration is measured from now."""
+        self._started = time.monotonic()
+        self._endpoints = {}
+        self._phases = {}
+        self._caches = {}
+        self._lock = threading.Lock()
+
+    def record_call(self, endpoint, seconds, size=0, retries=0, error=False):
+        """
+        Record an API call, including all its attempts.
+
+        :param endpoint: endpoint name
+        :param seconds: duration of the call
+        :param size: number of bytes received
+        :param retries: number of retried attempts
+        :param error: whether the call failed without a response
+        """
+        with self._lock:
+            endpoint_metrics = self._endpoints.setdefault(endpoint, {"calls": 0, "errors": 0, "retries": 0, "bytes": 0, "latencies": []})
+            endpoint_metrics["calls"] += 1
+            endpoint_metrics["errors"] += error
+            endpoint_metrics["retries"] += retries
+            endpoint_metrics["bytes"] += size
+            endpoint_metrics["latencies"].append(seconds * 1000)
+
+    def record_cache(self, cache, hit):
+        """
+        Record a cache lookup.
+
+        :param cache: cache name
+        :param hit: whether the lookup was a hit
+        """
+        with self._lock:
+            cache_metrics = self._caches.setdefault(cache, {"hits": 0, "misses": 0})
+            cache_metrics["hits" if hit else "misses"] += 1
+
+    @contextmanager
+    def timer(self, phase):
+        """Measure the time spent in the body of the with statement as a named phase."""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            seconds = time.monotonic() - started
+            with self._lock:
+                phase_metrics = self._phases.setdefault(phase, {"count": 0, "seconds": 0})
+                phase_metrics["count"] += 1
+                phase_metrics["seconds"] += seconds
+
+    @classmethod
+    def _get_latency_metrics(cls, latencies):
+        latencies = sorted(latencies)
+        histogram = [0] * (len(cls.LATENCY_BUCKETS_MS) + 1)
+        for latency in latencies:
+            histogram[bisect_left(cls.LATENCY_BUCKETS_MS, latency)] += 1
+
+        labels = [f"<={bucket}ms" for bucket in cls.LATENCY_BUCKETS_MS] + [f">{cls.LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            "p50_ms": round(latencies[(len(latencies) - 1) // 2], 1),
+            "p95_ms": round(latencies[(len(latencies) - 1) * 95 // 100], 1),
+            "max_ms": round(latencies[-1], 1),
+            "histogram": {label: count for label, count in zip(labels, histogram) if count},
+        }
+
+    def get_summary(self):
+        """
+        Get the metrics recorded so far.
+
+        :return: JSON serializable dictionary of the metrics
+        """
+        with self._lock:
+            endpoints = {
+                endpoint: {
+                    "calls": endpoint_metrics["calls"],
+                    "errors": endpoint_metrics["errors"],
+                    "retries": endpoint_metrics["retries"],
+                    "bytes": endpoint_metrics["bytes"],
+                    **self._get_latency_metrics(endpoint_metrics["latencies"]),
+                }
+                for endpoint, endpoint_metrics in self._endpoints.items()
+            }
+            phases = {phase: {"count": metrics["count"], "seconds": round(metrics["seconds"], 3)} for phase, metrics in self._phases.items()}
+            caches = {cache: dict(metrics) for cache, metrics in self._caches.items()}
+
+        return {
+            "total_seconds": round(time.monotonic() - self._started, 3),
+            "api_calls": sum(endpoint_metrics["calls"] for endpoint_metrics in endpoints.values()),
+            "endpoints": endpoints,
+            "phases": phases,
+            "caches": caches,
+        }
+
+
+def _compile_path(path):
+    """
+    Compile a field path into an extractor function.
+
+    Paths are dot-separated keys, where 'key[]' maps the rest of the path over the items of a list
+    and 'key[Field=A|B]' only keeps the items whose 'Field' is one of the listed values. An index
+    after the list step, as in 'key[0]' or 'key[Field=A][0]', selects one of the mapped values instead.
+    A missing key or an unexpected type yields None, or an empty list below a list step without index.
+
+    :param path: field path, for example 'Assets[Type=Domains].Value'
+    :return: function extracting the path from a dictionary
+    """
+
+    def get_value(value):
+        return value
+
+    extractor = get_value
+    for step in reversed(path.split(".")):
+        key = step.partition("[")[0]
+        brackets = re.findall(r"\[([^\]]*)\]", step)
+        index = int(brackets.pop()) if brackets and brackets[-1].isdigit() else None
+        extractor = _compile_step(key, brackets[0] if brackets else None, step.endswith("]"), extractor, index)
+
+    return extractor
+
+
+def _compile_step(key, item_filter, is_list, next_extractor, index=None):
+    if not is_list:
+
+        def get_key(value):
+            return next_extractor(value.get(key) if isinstance(value, dict) else None)
+
+        return get_key
+
+    filter_key, _, filter_values = (item_filter or "").partition("=")
+    filter_values = frozenset(filter_values.split("|"))
+
+    def get_items(value):
+        items = value.get(key) if isinstance(value, dict) else None
+        if not isinstance(items, list):
+            return [] if index is None else None
+
+        if filter_key:
+            items = [item for item in items if isinstance(item, dict) and item.get(filter_key) in filter_values]
+        item_values = [item_value for item in items if (item_value := next_extractor(item)) is not None]
+        if index is None:
+            return item_values
+        return item_values[index] if index < len(item_values) else None
+
+    return get_items
+
+
+def compile_field_mapping(mapping, skip_empty=False):
+    """
+    Compile a declarative field mapping into a function building the mapped dictionary.
+
+    :param mapping: dictionary of output keys to field paths, see _compile_path for the path syntax
+    :param skip_empty: whether output keys with a None, empty string or empty list value are left out
+    :return: function mapping a dictionary to a new dictionary
+    """
+    extractors = tuple((key, _compile_path(path)) for key, path in mapping.items())
+
+    if not skip_empty:
+        return lambda record: {key: extractor(record) for key, extractor in extractors}
+
+    def map_fields(record):
+        fields = {}
+        for key, extractor in extractors:
+            value = extractor(record)
+            if value is not None and value != "" and value != []:
+                fields[key] = value
+        return fields
+
+    return map_fields
+
+
+def get_retry_after_seconds(value):
+    """
+    Parse a Retry-After header.
+
+    :param value: header value, either a number of seconds or an HTTP date
+    :return: number of seconds to wait or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
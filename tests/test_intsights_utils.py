@@ -0,0 +1,296 @@
+# File: tests/test_intsights_utils.py
+#
+# Copyright (c) 2019-2025 IntSights Cyber Intelligence Ltd.
+#
+# This unpublished material is proprietary to IntSights.
+# All rights reserved. The methods and
+# techniques described herein are considered trade secrets
+# and/or confidential. Reproduction or distribution, in whole
+# or in part, is forbidden except by express written permission
+# of IntSights.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+"""Tests of the helpers of intsights_utils, which have no dependency on the SOAR platform."""
+
+import os
+import threading
+import time
+
+import pytest
+
+import intsights_utils
+from intsights_utils import ConcurrencyLimiter, IocCache, compile_field_mapping
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Freeze time.time at the current time, tests move it forward by updating clock[0]."""
+    now = [time.time()]
+    monkeypatch.setattr(intsights_utils.time, "time", lambda: now[0])
+    return now
+
+
+# ConcurrencyLimiter
+
+
+def test_limiter_starts_at_half_the_maximum():
+    assert ConcurrencyLimiter(8).get_summary()["limit"] == 4
+    assert ConcurrencyLimiter(1).get_summary()["limit"] == 1
+
+
+def test_limiter_halves_once_per_epoch():
+    limiter = ConcurrencyLimiter(8)
+    tickets = [limiter.acquire() for _ in range(4)]
+
+    for ticket in tickets:
+        limiter.release(ticket, overloaded=True)
+
+    summary = limiter.get_summary()
+    assert summary["limit"] == 2
+    assert summary["decreases"] == 1
+
+    # A request started after the decrease halves the limit again
+    limiter.release(limiter.acquire(), overloaded=True)
+    assert limiter.get_summary()["limit"] == 1
+
+
+def test_limiter_does_not_go_below_minimum():
+    limiter = ConcurrencyLimiter(8, initial_limit=2, min_limit=2)
+    limiter.release(limiter.acquire(), overloaded=True)
+
+    summary = limiter.get_summary()
+    assert summary["limit"] == 2
+    assert summary["decreases"] == 0
+
+
+def test_limiter_grows_only_when_saturated():
+    limiter = ConcurrencyLimiter(8, initial_limit=2)
+
+    # One request at a time never reaches the limit, however many succeed
+    for _ in range(10):
+        limiter.release(limiter.acquire(), seconds=0.01)
+    assert limiter.get_summary()["limit"] == 2
+
+    tickets = [limiter.acquire() for _ in range(2)]
+    for ticket in tickets:
+        limiter.release(ticket, seconds=0.01)
+
+    summary = limiter.get_summary()
+    assert summary["limit"] == 3
+    assert summary["increases"] == 1
+
+
+def test_limiter_does_not_grow_over_maximum():
+    limiter = ConcurrencyLimiter(2, initial_limit=2)
+    tickets = [limiter.acquire() for _ in range(2)]
+    for ticket in tickets:
+        limiter.release(ticket, seconds=0.01)
+
+    assert limiter.get_summary()["limit"] == 2
+
+
+def test_limiter_halves_on_latency_increase():
+    limiter = ConcurrencyLimiter(8)
+    for seconds in [0.01] * ConcurrencyLimiter.LATENCY_WINDOW + [0.1] * ConcurrencyLimiter.LATENCY_WINDOW:
+        limiter.release(limiter.acquire(), seconds=seconds)
+
+    summary = limiter.get_summary()
+    assert summary["limit"] == 2
+    assert summary["decreases"] == 1
+
+
+def test_limiter_ignores_failures_without_overload():
+    limiter = ConcurrencyLimiter(8)
+    limiter.release(limiter.acquire())
+
+    assert limiter.get_summary()["limit"] == 4
+
+
+def test_limiter_blocks_over_limit():
+    limiter = ConcurrencyLimiter(1)
+    ticket = limiter.acquire()
+    acquired = threading.Event()
+
+    def acquire():
+        limiter.release(limiter.acquire())
+        acquired.set()
+
+    thread = threading.Thread(target=acquire)
+    thread.start()
+    assert not acquired.wait(0.1)
+
+    limiter.release(ticket)
+    assert acquired.wait(5)
+    thread.join()
+
+
+# IocCache
+
+
+def test_cache_returns_found_and_unknown_iocs(tmp_path):
+    cache = IocCache(str(tmp_path / "cache"), ttl=60, negative_ttl=60, max_entries=10)
+    cache.set("a.com", {"Value": "a.com"})
+    cache.set("b.com", None)
+
+    assert cache.get("a.com") == (True, {"Value": "a.com"})
+    assert cache.get("b.com") == (True, None)
+    assert cache.get("c.com") == (False, None)
+
+
+def test_cache_expires_found_and_unknown_iocs(tmp_path, clock):
+    cache = IocCache(str(tmp_path / "cache"), ttl=60, negative_ttl=10, max_entries=10)
+    cache.set("a.com", {"Value": "a.com"})
+    cache.set("b.com", None)
+
+    clock[0] += 11
+    assert cache.get("a.com") == (True, {"Value": "a.com"})
+    assert cache.get("b.com") == (False, None)
+
+    clock[0] += 50
+    assert cache.get("a.com") == (False, None)
+
+
+def test_cache_skips_lookups_without_ttl(tmp_path):
+    cache = IocCache(str(tmp_path / "cache"), ttl=60, negative_ttl=0, max_entries=10)
+    cache.set("b.com", None)
+
+    assert cache.get("b.com") == (False, None)
+    assert not os.path.exists(tmp_path / "cache")
+
+
+def test_cache_is_shared_across_instances(tmp_path):
+    IocCache(str(tmp_path / "cache"), ttl=60, negative_ttl=60, max_entries=10).set("a.com", {"Value": "a.com"})
+
+    assert IocCache(str(tmp_path / "cache"), ttl=60, negative_ttl=60, max_entries=10).get("a.com") == (True, {"Value": "a.com"})
+
+
+def test_cache_evicts_least_recently_used(tmp_path, clock):
+    cache = IocCache(str(tmp_path / "cache"), ttl=3600, negative_ttl=3600, max_entries=2)
+    for key in ("a.com", "b.com", "c.com"):
+        cache.set(key, {"Value": key})
+
+    # Reads record their access time, so the oldest written lookup is kept once read again
+    clock[0] += 100
+    cache.get("a.com")
+    cache.get("c.com")
+    cache.save()
+
+    assert len(os.listdir(tmp_path / "cache")) == 2
+    assert cache.get("a.com")[0]
+    assert cache.get("c.com")[0]
+    assert cache.get("b.com") == (False, None)
+
+
+def test_cache_save_without_directory(tmp_path):
+    IocCache(str(tmp_path / "cache"), ttl=60, negative_ttl=60, max_entries=10).save()
+
+    assert not os.path.exists(tmp_path / "cache")
+
+
+def test_cache_lock_gives_up_after_timeout(tmp_path):
+    cache = IocCache(str(tmp_path / "cache"), ttl=60, negative_ttl=60, max_entries=10, lock_timeout=0.05)
+    results = []
+
+    def lock(key):
+        with cache.lock(key) as locked:
+            results.append((key, locked))
+
+    with cache.lock("a.com") as locked:
+        assert locked
+        for key in ("a.com", "b.com"):
+            thread = threading.Thread(target=lock, args=(key,))
+            thread.start()
+            thread.join()
+
+    assert results == [("a.com", False), ("b.com", True)]
+
+
+def test_cache_falls_back_when_path_is_not_a_directory(tmp_path):
+    path = tmp_path / "cache"
+    path.write_text("")
+    cache = IocCache(str(path), ttl=60, negative_ttl=60, max_entries=10)
+
+    assert cache.get("a.com") == (False, None)
+    with cache.lock("a.com") as locked:
+        assert not locked
+    with pytest.raises(OSError):
+        cache.set("a.com", {"Value": "a.com"})
+    cache.save()
+    assert os.listdir(tmp_path) == ["cache"]
+
+
+# compile_field_mapping
+
+
+ALERT = {
+    "_id": "1",
+    "Details": {"Title": "Phishing domain", "Severity": "High", "Tags": [{"Name": "a"}, "b", {"Name": "c"}]},
+    "Assets": [
+        {"Type": "IPs", "Value": "1.1.1.1"},
+        {"Type": "SubDomains", "Value": "www.a.com"},
+        {"Type": "Domains", "Value": "a.com"},
+    ],
+}
+
+
+@pytest.mark.parametrize(
+    "path, expected",
+    [
+        ("_id", "1"),
+        ("Details.Title", "Phishing domain"),
+        ("Details.Tags[].Name", ["a", "c"]),
+        ("Assets[].Value", ["1.1.1.1", "www.a.com", "a.com"]),
+        ("Assets[Type=Domains].Value", ["a.com"]),
+        ("Assets[Type=Domains|SubDomains].Value", ["www.a.com", "a.com"]),
+        ("Assets[Type=Domains|SubDomains][0].Value", "www.a.com"),
+        ("Assets[Type=Domains|SubDomains][1].Value", "a.com"),
+        ("Assets[Type=Domains|SubDomains][2].Value", None),
+        ("Assets[0].Value", "1.1.1.1"),
+        ("Assets[Type=Hashes].Value", []),
+        ("Assets[Type=Hashes][0].Value", None),
+    ],
+)
+def test_mapping_paths(path, expected):
+    assert compile_field_mapping({"field": path})(ALERT) == {"field": expected}
+
+
+@pytest.mark.parametrize(
+    "record",
+    [
+        {},
+        {"Details": None, "Assets": None},
+        {"Details": "Phishing domain", "Assets": "a.com"},
+        {"Details": ["Phishing domain"], "Assets": {"Type": "Domains", "Value": "a.com"}},
+        {"Details": {"Title": None, "Tags": "a"}, "Assets": ["a.com", None, {"Type": "Domains"}]},
+    ],
+)
+def test_mapping_missing_and_wrong_typed_keys(record):
+    mapping = {
+        "title": "Details.Title",
+        "tags": "Details.Tags[].Name",
+        "domains": "Assets[Type=Domains].Value",
+        "domain": "Assets[Type=Domains|SubDomains][0].Value",
+    }
+
+    assert compile_field_mapping(mapping)(record) == {"title": None, "tags": [], "domains": [], "domain": None}
+
+
+def test_mapping_of_non_dictionary_record():
+    assert compile_field_mapping({"title": "Details.Title", "tags": "Details.Tags[]"})(["a"]) == {"title": None, "tags": []}
+
+
+def test_mapping_skip_empty():
+    mapping = {"id": "_id", "title": "Details.Title", "hashes": "Assets[Type=Hashes].Value", "ip": "Assets[Type=IPs][0].Value"}
+    record = {"_id": "1", "Details": {"Title": ""}, "Assets": [{"Type": "IPs", "Value": "1.1.1.1"}]}
+
+    assert compile_field_mapping(mapping, skip_empty=True)(record) == {"id": "1", "ip": "1.1.1.1"}
+    assert compile_field_mapping(mapping, skip_empty=True)({}) == {}